@@ -0,0 +1,248 @@
+"""Performance benchmarks of SSL4EOEUForestTG on a synthetic local dataset tree.
+
+Run from the repository root::
+
+    python -m benchmarks.run --groups 256 --workers 0 2 4 --output bench.json
+    python -m benchmarks.run --compare bench.json --tolerance 0.2
+
+Each benchmark runs in a fresh (spawned) process, so its peak RSS is
+reported separately. Metrics ending in ``_s`` or ``_mb`` are better when
+lower, those ending in ``_per_s`` when higher. With ``--compare`` the run
+exits with status 1 if any metric is more than ``--tolerance`` worse than
+in the given results file.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import resource
+import tempfile
+import statistics
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+SEASONS = ("winter", "spring", "summer", "fall")
+ACQUISITIONS = {
+    "winter": ("20180206T084129", "20180206T084229", "T32ULB"),
+    "spring": ("20180412T103021", "20180412T103025", "T32ULB"),
+    "summer": ("20180710T103021", "20180710T103025", "T32ULB"),
+    "fall": ("20181018T103021", "20181018T103025", "T32ULB"),
+}
+
+
+def make_tree(base_dir: Path, n_groups: int, size: int = 264) -> Path:
+    """Synthetic tree in the layout of utils.process_group, n_groups groups with all four seasons."""
+    from tests.test_utils import create_dummy_tif
+
+    for i in range(n_groups):
+        group_id = f"{i:07d}"
+        origin = (500000 + (i % 100) * size * 10, 5000000 - (i // 100) * size * 10)
+        (base_dir / "masks" / group_id).mkdir(parents=True)
+        create_dummy_tif(base_dir / "masks" / group_id / "mask.tif", width=size, height=size, origin=origin, fill=1)
+        for j, season in enumerate(SEASONS):
+            start, end, tile_id = ACQUISITIONS[season]
+            image_dir = base_dir / "images" / group_id / f"{start}_{end}_{tile_id}"
+            image_dir.mkdir(parents=True)
+            create_dummy_tif(
+                image_dir / "all_bands.tif", width=size, height=size, origin=origin, count=12, fill=100 * (j + 1) + i % 100
+            )
+    return base_dir
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MiB.
+
+    On Linux this is VmHWM, which exec resets, so a spawned benchmark
+    process does not report the peak of the parent that started it (as
+    ru_maxrss does). Elsewhere ru_maxrss of this process is used.
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    scale = 1 if platform.system() == "Darwin" else 1024  # ru_maxrss is bytes on macOS, KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 2 ** 20
+
+
+def _timed(fn, repeat: int) -> float:
+    """Median wall time of repeat calls of fn."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def bench_metadata_build(tree: str, n_groups: int, repeat: int, **_) -> dict:
+    from ssl4eo_eu_forest.utils import metadata_jsonl_from_ssl4eo_eu_forest_dir
+
+    seconds = _timed(lambda: metadata_jsonl_from_ssl4eo_eu_forest_dir(tree, output="bench.jsonl"), repeat)
+    os.remove(os.path.join(tree, "bench.jsonl"))
+    return {"metadata_build_s": seconds, "metadata_build_groups_per_s": n_groups / seconds}
+
+
+def bench_construction(tree: str, root: str, repeat: int, **_) -> dict:
+    from ssl4eo_eu_forest import SSL4EOEUForestTG
+
+    return {
+        "construction_cold_s": _timed(lambda: SSL4EOEUForestTG(root=root, local_dir=tree, refresh_metadata=True), repeat),
+        "construction_warm_s": _timed(lambda: SSL4EOEUForestTG(root=root, local_dir=tree), repeat),
+    }
+
+
+def bench_getitem(tree: str, root: str, n_groups: int, **_) -> dict:
+    from ssl4eo_eu_forest import SSL4EOEUForestTG
+
+    ds = SSL4EOEUForestTG(root=root, local_dir=tree, cache_bytes=4 << 30)
+    indices = range(min(n_groups, 64))
+
+    def latency():
+        start = time.perf_counter()
+        for idx in indices:
+            ds[idx]
+        return (time.perf_counter() - start) / len(indices)
+
+    # cold: files are read and decoded, warm: served by the in-memory sample cache
+    return {"getitem_cold_s": latency(), "getitem_warm_s": latency()}
+
+
+def bench_dataloader(tree: str, root: str, workers: int, batch_size: int, **_) -> dict:
+    from torch.utils.data import DataLoader
+    from ssl4eo_eu_forest import SSL4EOEUForestTG
+    from ssl4eo_eu_forest.collate import collate_seasonal
+
+    ds = SSL4EOEUForestTG(root=root, local_dir=tree, crop_size=128)
+    # this process is spawned, which would otherwise become the start method of the workers too
+    context = multiprocessing.get_context(multiprocessing.get_all_start_methods()[0]) if workers else None
+    loader = DataLoader(
+        ds, batch_size=batch_size, shuffle=True, num_workers=workers,
+        collate_fn=collate_seasonal, multiprocessing_context=context
+    )
+    start = time.perf_counter()
+    n = sum(len(batch["image"]) for batch in loader)
+    return {f"dataloader_{workers}_workers_samples_per_s": n / (time.perf_counter() - start)}
+
+
+def bench_first_sample(tree: str, root: str, repeat: int, **_) -> dict:
+    from ssl4eo_eu_forest import SSL4EOEUForestTG, SSL4EOEUForestStream
+
+    # the metadata index is rebuilt each time, as on a first run
+    return {
+        "first_sample_indexed_s": _timed(lambda: SSL4EOEUForestTG(root=root, local_dir=tree, refresh_metadata=True)[0], repeat),
+        "first_sample_stream_s": _timed(lambda: next(iter(SSL4EOEUForestStream(root=root, local_dir=tree))), repeat),
+    }
+
+
+def _quiet():
+    import logging
+    import ssl4eo_eu_forest.dataset  # noqa: F401, configures the logger on import
+    logging.getLogger("SSL4EOEUForestTG").setLevel(logging.WARNING)
+
+
+def _run_isolated(name: str, kwargs: dict) -> dict:
+    _quiet()
+    result = BENCHMARKS[name](**kwargs)
+    suffix = f"_{kwargs['workers']}_workers" if name == "dataloader" else ""
+    result[f"{name}{suffix}_peak_rss_mb"] = peak_rss_mb()
+    return result
+
+
+BENCHMARKS = {
+    "metadata_build": bench_metadata_build,
+    "construction": bench_construction,
+    "getitem": bench_getitem,
+    "dataloader": bench_dataloader,
+    "first_sample": bench_first_sample,
+}
+
+
+def run(
+    workdir: str,
+    n_groups: int = 64,
+    workers=(0, 2),
+    batch_size: int = 8,
+    repeat: int = 3,
+    benchmarks=tuple(BENCHMARKS)
+) -> dict:
+    """Build a synthetic tree under workdir and run the benchmarks, returns a flat dict of metrics."""
+    from ssl4eo_eu_forest.utils import metadata_jsonl_from_ssl4eo_eu_forest_dir
+
+    _quiet()
+    tree = os.path.join(workdir, f"tree-{n_groups}")
+    if not os.path.exists(os.path.join(tree, "meta.jsonl")):
+        shutil.rmtree(tree, ignore_errors=True)
+        make_tree(Path(tree), n_groups)
+        metadata_jsonl_from_ssl4eo_eu_forest_dir(tree)
+    kwargs = {"tree": tree, "root": os.path.join(workdir, "root"), "n_groups": n_groups,
+              "repeat": repeat, "batch_size": batch_size}
+
+    jobs = [(name, kwargs) for name in benchmarks if name != "dataloader"]
+    if "dataloader" in benchmarks:
+        jobs += [("dataloader", {**kwargs, "workers": w}) for w in workers]
+
+    results = {}
+    spawn = multiprocessing.get_context("spawn")
+    for name, job_kwargs in jobs:
+        with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as executor:
+            results.update(executor.submit(_run_isolated, name, job_kwargs).result())
+    return results
+
+
+def regressions(results: dict, baseline: dict, tolerance: float) -> list:
+    """Metrics of results more than tolerance (relative) worse than in baseline."""
+    worse = []
+    for key, value in results.items():
+        if key not in baseline or not baseline[key]:
+            continue
+        change = (value - baseline[key]) / baseline[key]
+        if key.endswith("_per_s"):
+            change = -change
+        if change > tolerance:
+            worse.append(f"{key}: {baseline[key]:.4g} -> {value:.4g} ({change:+.0%} worse)")
+    return worse
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run", description=__doc__.splitlines()[0])
+    parser.add_argument("--groups", type=int, default=64, help="groups in the synthetic tree")
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 2], help="DataLoader worker counts")
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=3, help="repetitions of timed calls, the median is reported")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), default=list(BENCHMARKS))
+    parser.add_argument("--workdir", default=None, help="keep the synthetic tree here (default: temporary)")
+    parser.add_argument("--output", default=None, help="write results as JSON")
+    parser.add_argument("--compare", default=None, help="JSON results to check for regressions against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="relative slowdown counted as regression")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = run(
+            args.workdir or tmp, n_groups=args.groups, workers=args.workers,
+            batch_size=args.batch_size, repeat=args.repeat, benchmarks=args.only
+        )
+
+    for key, value in results.items():
+        print(f"{key:50s} {value:12.4f}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            worse = regressions(results, json.load(f), args.tolerance)
+        for line in worse:
+            print(f"REGRESSION {line}")
+        return 1 if worse else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
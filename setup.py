@@ -8,16 +8,19 @@ setup(
     packages=find_packages(),
     install_requires=[
      "torch>=1.12",
-        "torchgeo>=0.4",
+        "torchgeo>=0.8",
         "rasterio>=1.3",
         "geopandas>=0.13",
         "shapely>=2.0",
         "folium>=0.14",
         "requests>=2.28",
+        "aiohttp>=3.8",
         "datasets>=2.14,<=2.19.2",
         "huggingface_hub>=0.17",
         "tqdm>=4.66",
-        "numpy>=1.23"
+        "numpy>=1.23",
+        "pyarrow>=12",
+        "pillow>=9"
     ],
-    python_requires=">=3.8",
+    python_requires=">=3.11",
 )
@@ -1 +1,35 @@
-from .dataset import SSL4EOEUForestTG
+"""TorchGeo-compatible loaders for the SSL4EO-EU Forest dataset.
+
+Public classes are imported on first access, so ``import ssl4eo_eu_forest``
+and light submodules such as ``ssl4eo_eu_forest.utils`` do not pay for
+torch, torchgeo or geopandas.
+"""
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .dataset import SSL4EOEUForestTG
+    from .store import SSL4EOEUForestStore
+    from .patches import SSL4EOEUForestPatches
+    from .iterable import SSL4EOEUForestStream
+
+_LAZY_ATTRIBUTES = {
+    "SSL4EOEUForestTG": ".dataset",
+    "SSL4EOEUForestStore": ".store",
+    "SSL4EOEUForestPatches": ".patches",
+    "SSL4EOEUForestStream": ".iterable",
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        import importlib
+        value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,139 @@
+"""Command line tools for the SSL4EO-EU Forest dataset, cf. ``python -m ssl4eo_eu_forest --help``."""
+import argparse
+import sys
+
+
+def _dataset(args, **kwargs):
+    from .dataset import SSL4EOEUForestTG
+    return SSL4EOEUForestTG(
+        root=args.root, repo_id=args.repo_id, revision=args.revision, local_dir=args.local_dir, **kwargs
+    )
+
+
+def _add_dataset_arguments(parser):
+    parser.add_argument("--root", required=True, help="local cache directory")
+    parser.add_argument("--repo-id", default="dm4eo/ssl4eo_eu_forest")
+    parser.add_argument("--revision", default="v1.0")
+    parser.add_argument("--local-dir", default=None, help="read a local copy of the dataset instead of the Hub")
+    parser.add_argument("--start", type=int, default=0, help="first sample index")
+    parser.add_argument("--stop", type=int, default=None, help="stop before this sample index")
+
+
+def prefetch(args):
+    dataset = _dataset(args)
+    stop = len(dataset) if args.stop is None else min(args.stop, len(dataset))
+    count = dataset.prefetch(range(args.start, stop), max_workers=args.max_workers)
+    print(f"Downloaded {count} files into {args.root}")
+
+
+def export(args):
+    from .store import export_store
+    dataset = _dataset(args, bands=args.bands)
+    stop = len(dataset) if args.stop is None else min(args.stop, len(dataset))
+    export_store(
+        dataset, args.output, range(args.start, stop),
+        shard_size=args.shard_size, max_workers=args.max_workers
+    )
+    print(f"Exported {stop - args.start} samples into {args.output}")
+
+
+def quicklooks(args):
+    from .quicklook import write_quicklooks
+    dataset = _dataset(args)
+    stop = len(dataset) if args.stop is None else min(args.stop, len(dataset))
+    written = write_quicklooks(
+        dataset, args.output, range(args.start, stop),
+        thumbnail_size=args.size, overwrite=args.overwrite, max_workers=args.max_workers
+    )
+    print(f"Wrote {len(written)} quicklooks into {args.output}")
+
+
+def cog(args):
+    from .cog import convert_tree_to_cog
+    converted = convert_tree_to_cog(args.path, max_workers=args.max_workers, blocksize=args.blocksize, compress=args.compress)
+    print(f"Converted {len(converted)} files below {args.path} to Cloud-Optimized GeoTIFF")
+
+
+def stats(args):
+    from .stats import band_stats_from_ssl4eo_eu_forest_dir
+    band_stats_from_ssl4eo_eu_forest_dir(args.path, output=args.output, chunksize=args.chunksize, max_workers=args.max_workers)
+    print(f"Wrote band statistics of {args.path} into {args.output}")
+
+
+def cache(args):
+    from .cache import TileCache, parse_size
+    max_bytes = None if args.max_bytes is None else parse_size(args.max_bytes)
+    if args.verify or args.repair:
+        dataset = _dataset(args, cache_quota=max_bytes)
+        stop = len(dataset) if args.stop is None else min(args.stop, len(dataset))
+        problems = dataset.tile_cache.verify(
+            dataset, range(args.start, stop), checksum=args.checksum, max_workers=args.max_workers
+        )
+        print(f"Found {len(problems)} bad cache entries")
+        if args.repair and problems:
+            repaired = dataset.tile_cache.repair(problems, max_workers=args.max_workers)
+            print(f"Downloaded {len(repaired)} files again")
+        tile_cache = dataset.tile_cache
+    else:
+        tile_cache = TileCache(args.root, max_bytes=max_bytes)
+    removed = tile_cache.evict()
+    if removed:
+        print(f"Evicted {len(removed)} files")
+    usage = tile_cache.usage()
+    print(f"{usage['files']} files, {usage['bytes'] / 2 ** 30:.2f} GiB in {args.root}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m ssl4eo_eu_forest")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    parser_prefetch = commands.add_parser("prefetch", help="warm the local tile cache")
+    _add_dataset_arguments(parser_prefetch)
+    parser_prefetch.add_argument("--max-workers", type=int, default=8, help="concurrent downloads")
+    parser_prefetch.set_defaults(func=prefetch)
+
+    parser_export = commands.add_parser("export", help="convert samples into a memory-mappable .npy store")
+    _add_dataset_arguments(parser_export)
+    parser_export.add_argument("--output", required=True, help="store directory")
+    parser_export.add_argument("--bands", nargs="+", default=None, help="Sentinel-2 bands to keep")
+    parser_export.add_argument("--shard-size", type=int, default=4096, help="samples per shard")
+    parser_export.add_argument("--max-workers", type=int, default=8, help="concurrent reads")
+    parser_export.set_defaults(func=export)
+
+    parser_quicklooks = commands.add_parser("quicklooks", help="write RGB and mask PNG quicklooks per group")
+    _add_dataset_arguments(parser_quicklooks)
+    parser_quicklooks.add_argument("--output", required=True, help="quicklook directory")
+    parser_quicklooks.add_argument("--size", type=int, default=256, help="thumbnail height per panel")
+    parser_quicklooks.add_argument("--overwrite", action="store_true", help="replace existing quicklooks")
+    parser_quicklooks.add_argument("--max-workers", type=int, default=8, help="concurrent samples")
+    parser_quicklooks.set_defaults(func=quicklooks)
+
+    parser_cog = commands.add_parser("cog", help="rewrite cached or local GeoTIFFs as Cloud-Optimized GeoTIFFs")
+    parser_cog.add_argument("path", help="cache root or local copy of the dataset")
+    parser_cog.add_argument("--max-workers", type=int, default=4, help="concurrent conversions")
+    parser_cog.add_argument("--blocksize", type=int, default=256, help="internal tile size")
+    parser_cog.add_argument("--compress", default="DEFLATE", help="GDAL compression")
+    parser_cog.set_defaults(func=cog)
+
+    parser_stats = commands.add_parser("stats", help="per-season band statistics for normalization")
+    parser_stats.add_argument("path", help="cache root or local copy of the dataset")
+    parser_stats.add_argument("--output", default="band_stats.json", help="summary file, relative to path")
+    parser_stats.add_argument("--chunksize", type=int, default=16, help="groups per worker task")
+    parser_stats.add_argument("--max-workers", type=int, default=None, help="worker processes")
+    parser_stats.set_defaults(func=stats)
+
+    parser_cache = commands.add_parser("cache", help="report usage of, verify, repair and shrink the tile cache")
+    _add_dataset_arguments(parser_cache)
+    parser_cache.add_argument("--verify", action="store_true", help="check cached files against the metadata")
+    parser_cache.add_argument("--repair", action="store_true", help="download bad entries again (implies --verify)")
+    parser_cache.add_argument("--checksum", action="store_true", help="also compare SHA256 with the Hub")
+    parser_cache.add_argument("--max-bytes", default=None, help="evict least recently used files above this size, e.g. 500G")
+    parser_cache.add_argument("--max-workers", type=int, default=8, help="concurrent checks")
+    parser_cache.set_defaults(func=cache)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
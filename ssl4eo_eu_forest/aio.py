@@ -0,0 +1,152 @@
+import asyncio
+import logging
+import threading
+import aiohttp
+from collections import deque
+from functools import partial
+from contextlib import ExitStack
+from rasterio.io import MemoryFile
+from rasterio.windows import Window
+from typing import Optional, Sequence, List, Dict, Any, Iterator, AsyncIterator, Tuple
+from .download import DownloadError
+
+logger = logging.getLogger("SSL4EOEUForestTG")
+
+
+def _read_bytes(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+class AsyncSampleLoader:
+    """Load samples of an SSL4EOEUForestTG over HTTP without touching the disk cache.
+
+    The mask and all seasonal images of a group are fetched concurrently
+    and decoded from memory (rasterio ``MemoryFile``), so the latency of a
+    sample is that of its slowest file rather than the sum of all round
+    trips. ``iterate``/``iter_samples`` keep the next ``prefetch`` groups
+    in flight while the current one is consumed. Bands, crops and
+    transforms follow the dataset. In local mode files are read from
+    local_dir instead.
+    """
+
+    def __init__(
+        self,
+        dataset,
+        prefetch: int = 4,
+        max_connections: int = 16,
+        retries: int = 3,
+        backoff: float = 1.0,
+        timeout: float = 60
+    ):
+        self.dataset = dataset
+        self.prefetch = prefetch
+        self.max_connections = max_connections
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+
+    def client_session(self) -> aiohttp.ClientSession:
+        """aiohttp session with a connection pool of max_connections, to be used as async context manager."""
+        return aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.max_connections),
+            timeout=aiohttp.ClientTimeout(total=self.timeout)
+        )
+
+    async def _fetch_bytes(self, session: aiohttp.ClientSession, url: Optional[str], path: str) -> bytes:
+        if url is None:
+            return await asyncio.get_running_loop().run_in_executor(None, _read_bytes, path)
+
+        for attempt in range(self.retries + 1):
+            try:
+                async with session.get(url) as response:
+                    response.raise_for_status()
+                    return await response.read()
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt == self.retries:
+                    raise DownloadError(f"Failed to fetch {url} after {self.retries + 1} attempts: {e}") from e
+                delay = self.backoff * 2 ** attempt
+                logger.warning(f"Fetching {url} failed ({e}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+    def _decode(
+        self,
+        idx: int,
+        buffers: Sequence[bytes],
+        band_indexes: Optional[List[int]],
+        window: Optional[Window]
+    ) -> Dict[str, Any]:
+        with ExitStack() as stack:
+            mask_src, *image_srcs = [
+                stack.enter_context(stack.enter_context(MemoryFile(buffer)).open())
+                for buffer in buffers
+            ]
+            sample = self.dataset._read_group(idx, mask_src, image_srcs, band_indexes, window)
+
+        if self.dataset.transforms:
+            sample = self.dataset.transforms(sample)
+
+        return sample
+
+    async def load(
+        self,
+        idx: int,
+        session: Optional[aiohttp.ClientSession] = None,
+        bands: Optional[Sequence[str]] = None,
+        window: Optional[Tuple[int, int, int, int]] = None
+    ) -> Dict[str, Any]:
+        """Fetch all files of sample idx concurrently and decode them in a worker thread."""
+        if session is None:
+            async with self.client_session() as session:
+                return await self.load(idx, session, bands, window)
+
+        dataset = self.dataset
+        band_indexes = dataset.band_indexes if bands is None else dataset._band_indexes(bands)
+        window = dataset._sample_window(idx) if window is None else Window(*window)
+        buffers = await asyncio.gather(*[
+            self._fetch_bytes(session, url, path) for url, path in dataset._group_files(idx)
+        ])
+        logger.debug("Fetched %d files (%d bytes) of sample %d", len(buffers), sum(map(len, buffers)), idx)
+        return await asyncio.get_running_loop().run_in_executor(
+            None, partial(self._decode, idx, buffers, band_indexes, window)
+        )
+
+    async def iterate(self, indices: Optional[Sequence[int]] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Yield samples in order, keeping the next prefetch samples in flight."""
+        indices = range(len(self.dataset)) if indices is None else indices
+        async with self.client_session() as session:
+            pending = deque()
+            try:
+                for idx in indices:
+                    pending.append(asyncio.ensure_future(self.load(idx, session)))
+                    if len(pending) > self.prefetch:
+                        yield await pending.popleft()
+                while pending:
+                    yield await pending.popleft()
+            finally:
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    def iter_samples(self, indices: Optional[Sequence[int]] = None) -> Iterator[Dict[str, Any]]:
+        """Synchronous ``iterate`` running the event loop in a background thread.
+
+        Prefetching continues while the caller processes a sample.
+        """
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=loop.run_forever, name="AsyncSampleLoader", daemon=True)
+        thread.start()
+        samples = self.iterate(indices)
+        try:
+            while True:
+                try:
+                    yield asyncio.run_coroutine_threadsafe(samples.__anext__(), loop).result()
+                except StopAsyncIteration:
+                    return
+        finally:
+            asyncio.run_coroutine_threadsafe(samples.aclose(), loop).result()
+            # on the loop thread, the caller may be running an event loop of its own (e.g. Jupyter)
+            asyncio.run_coroutine_threadsafe(loop.shutdown_default_executor(), loop).result()
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.close()
@@ -0,0 +1,207 @@
+import os
+import re
+import logging
+import threading
+import rasterio
+import requests
+from rasterio.windows import Window
+from concurrent.futures import ThreadPoolExecutor
+from tqdm import tqdm
+from typing import Optional, Sequence, Iterable, List, Tuple, Dict, Any
+from .download import make_session, download_files, _advertised_sha256, _sha256
+
+logger = logging.getLogger("SSL4EOEUForestTG")
+
+# Top-level directories of cached dataset files, as in the dataset repo
+CACHE_DIRS = ("masks", "images")
+
+_SIZE_UNITS = {"": 1, "K": 1 << 10, "M": 1 << 20, "G": 1 << 30, "T": 1 << 40}
+
+
+def parse_size(size: str) -> int:
+    """Bytes of a size like ``500G``, ``1.5T`` or ``1048576``."""
+    match = re.fullmatch(r"\s*([0-9.]+)\s*([KMGT]?)i?B?\s*", str(size), re.IGNORECASE)
+    if match is None:
+        raise ValueError(f"Invalid size {size!r}")
+    return int(float(match.group(1)) * _SIZE_UNITS[match.group(2).upper()])
+
+
+def check_file(path: str, width: Optional[int] = None, height: Optional[int] = None, sha256: Optional[str] = None) -> Optional[str]:
+    """Reason why the cached raster at path is bad, or None if it is fine.
+
+    The header is opened and its size compared with the expected width and
+    height, the last row of the first band is read to catch truncated
+    files. With sha256 the file content is hashed as well.
+    """
+    try:
+        with rasterio.open(path) as src:
+            if (width is not None and src.width != width) or (height is not None and src.height != height):
+                return f"size {src.width}x{src.height}, expected {width}x{height}"
+            src.read(1, window=Window(0, src.height - 1, src.width, 1))
+    except rasterio.errors.RasterioError as e:
+        return f"unreadable: {e}"
+    if sha256 is not None and _sha256(path) != sha256:
+        return "SHA256 mismatch"
+    return None
+
+
+class TileCache:
+    """Disk cache of dataset files under root, keyed by their path in the dataset repo.
+
+    Files live at ``root/<mask_path>`` and ``root/<image path>``, the
+    layout of the dataset repo, so every acquisition of a group has its own
+    entry. With max_bytes the cache is kept below that size: once the
+    bytes added in this process push the estimated usage over the quota,
+    the least recently used files are evicted down to low_water times the
+    quota. Cache hits refresh the mtime of a file, which serves as its
+    last use, so the files of the group being loaded are evicted last as
+    long as the quota holds many groups.
+    """
+
+    def __init__(self, root: str, max_bytes: Optional[int] = None, low_water: float = 0.9):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.low_water = low_water
+        self._lock = threading.Lock()
+        self._estimate = None
+
+    def __getstate__(self):
+        # for DataLoader workers, which start with a fresh usage estimate
+        return {**self.__dict__, "_lock": None, "_estimate": None}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def path(self, rel_path: str) -> str:
+        """Cache path of a file of the dataset repo."""
+        return os.path.join(self.root, rel_path)
+
+    def entries(self) -> List[Tuple[str, int, float]]:
+        """(path, bytes, last use) of all cached files, without partial downloads."""
+        entries = []
+        for top in CACHE_DIRS:
+            for dirpath, _, filenames in os.walk(os.path.join(self.root, top)):
+                for name in filenames:
+                    if name.endswith((".part", ".tmp")):
+                        continue
+                    path = os.path.join(dirpath, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    entries.append((path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def usage(self) -> Dict[str, Any]:
+        """Number and bytes of cached files next to the quota."""
+        entries = self.entries()
+        return {"files": len(entries), "bytes": sum(size for _, size, _ in entries), "max_bytes": self.max_bytes}
+
+    def touch(self, path: str) -> None:
+        """Mark path as just used, only tracked with a quota."""
+        if self.max_bytes is not None:
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+
+    def added(self, nbytes: int) -> None:
+        """Account for a newly cached file, evicting old files when over the quota."""
+        if self.max_bytes is None:
+            return
+        with self._lock:
+            if self._estimate is None:
+                self._estimate = self.usage()["bytes"]
+            else:
+                self._estimate += nbytes
+            if self._estimate <= self.max_bytes:
+                return
+        self.evict()
+
+    def evict(self, max_bytes: Optional[int] = None) -> List[str]:
+        """Remove least recently used files down to low_water * max_bytes (default: the quota) if over max_bytes.
+
+        Returns the removed paths.
+        """
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        if max_bytes is None:
+            return []
+        entries = sorted(self.entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        if total <= max_bytes:
+            with self._lock:
+                self._estimate = total
+            return []
+        target = int(max_bytes * self.low_water)
+        removed = []
+        for path, size, _ in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed.append(path)
+        with self._lock:
+            self._estimate = total
+        if removed:
+            logger.info("Evicted %d files from the tile cache, %.1f MiB remain", len(removed), total / 2 ** 20)
+        return removed
+
+    def verify(
+        self,
+        dataset,
+        indices: Optional[Sequence[int]] = None,
+        checksum: bool = False,
+        max_workers: int = 8,
+        progress: bool = True
+    ) -> List[Tuple[str, str, str]]:
+        """(url, path, reason) of bad cached files of the given samples (default: all) of dataset.
+
+        Files are checked in a thread pool with :func:`check_file` against
+        the width and height in the metadata. With checksum, files are also
+        compared with the SHA256 the Hub advertises for them. Files not
+        cached yet are skipped.
+        """
+        indices = range(len(dataset)) if indices is None else indices
+        jobs = []
+        for idx in indices:
+            images = dataset._group_images(idx)
+            sizes = [(dataset.df["mask_width"].iat[idx], dataset.df["mask_height"].iat[idx])]
+            sizes += list(zip(images["width"], images["height"]))
+            for (url, path), (width, height) in zip(dataset._group_files(idx), sizes):
+                if url is not None and os.path.exists(path):
+                    jobs.append((url, path, int(width), int(height)))
+        session = make_session(pool_size=max_workers) if checksum else None
+
+        def check(job):
+            url, path, width, height = job
+            sha256 = None
+            if checksum:
+                try:
+                    with session.head(url, allow_redirects=True, timeout=60) as response:
+                        sha256 = _advertised_sha256(response)
+                except requests.RequestException as e:
+                    logger.warning("No checksum for %s (%s), checking the header only", path, e)
+            reason = check_file(path, width, height, sha256)
+            return None if reason is None else (url, path, reason)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            problems = [
+                problem for problem in tqdm(executor.map(check, jobs), total=len(jobs), desc="Verifying cache", disable=not progress)
+                if problem is not None
+            ]
+        for url, path, reason in problems:
+            logger.warning("Bad cache entry %s: %s", path, reason)
+        return problems
+
+    def repair(self, problems: Iterable[Tuple[str, str, str]], max_workers: int = 8, progress: bool = True) -> List[str]:
+        """Delete the bad entries found by verify and download them again, returns the fetched paths."""
+        jobs = []
+        for url, path, _ in problems:
+            if os.path.exists(path):
+                os.remove(path)
+            jobs.append((url, path))
+        return download_files(jobs, max_workers=max_workers, progress=progress)
@@ -0,0 +1,91 @@
+import os
+import glob
+import logging
+import rasterio
+import rasterio.shutil
+from concurrent.futures import ThreadPoolExecutor
+from tqdm import tqdm
+from typing import Optional, List
+
+logger = logging.getLogger("SSL4EOEUForestTG")
+
+# GDAL configuration for HTTP range reads through /vsicurl/: no directory
+# listings or sidecar probes, merged and multiplexed range requests over
+# reused connections, and a block cache shared by all open files.
+VSICURL_OPTIONS = {
+    "GDAL_DISABLE_READDIR_ON_OPEN": "EMPTY_DIR",
+    "CPL_VSIL_CURL_ALLOWED_EXTENSIONS": ".tif,.tiff",
+    "GDAL_HTTP_MERGE_CONSECUTIVE_RANGES": "YES",
+    "GDAL_HTTP_MULTIPLEX": "YES",
+    "GDAL_HTTP_MAX_RETRY": "3",
+    "GDAL_HTTP_RETRY_DELAY": "1",
+    "VSI_CACHE": "TRUE",
+    "VSI_CACHE_SIZE": str(64 << 20),
+    "CPL_VSIL_CURL_CACHE_SIZE": str(256 << 20),
+    "GDAL_CACHEMAX": 256,
+}
+
+
+def vsicurl_path(url: str) -> str:
+    """GDAL path reading url with HTTP range requests."""
+    return f"/vsicurl/{url}"
+
+
+def remote_env(**options) -> rasterio.Env:
+    """rasterio environment for /vsicurl/ reads, options override VSICURL_OPTIONS."""
+    return rasterio.Env(**{**VSICURL_OPTIONS, **options})
+
+
+def is_cog(path: str) -> bool:
+    """Whether path is a GeoTIFF with the Cloud-Optimized layout."""
+    with rasterio.open(path) as src:
+        return src.driver == "GTiff" and src.tags(ns="IMAGE_STRUCTURE").get("LAYOUT") == "COG"
+
+
+def to_cog(
+    src_path: str,
+    dst_path: Optional[str] = None,
+    blocksize: int = 256,
+    compress: str = "DEFLATE"
+) -> str:
+    """Rewrite a GeoTIFF as Cloud-Optimized GeoTIFF with internal tiles and overviews.
+
+    Writes atomically next to dst_path, which defaults to src_path (in place).
+    """
+    dst_path = src_path if dst_path is None else dst_path
+    tmp_path = f"{dst_path}.{os.getpid()}.cog.tmp"
+    with rasterio.open(src_path) as src:
+        predictor = "2" if src.dtypes[0].startswith(("int", "uint")) else "YES"
+    try:
+        rasterio.shutil.copy(
+            src_path, tmp_path, driver="COG",
+            BLOCKSIZE=blocksize, COMPRESS=compress, PREDICTOR=predictor,
+            OVERVIEWS="AUTO", RESAMPLING="NEAREST", NUM_THREADS="ALL_CPUS"
+        )
+        os.replace(tmp_path, dst_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return dst_path
+
+
+def convert_tree_to_cog(
+    path: str,
+    max_workers: int = 4,
+    blocksize: int = 256,
+    compress: str = "DEFLATE",
+    progress: bool = True
+) -> List[str]:
+    """Rewrite all GeoTIFFs below path (a cache root or local copy) in place as COGs.
+
+    Files that already are COGs are skipped, returns the converted paths.
+    """
+    paths = sorted(glob.glob(os.path.join(glob.escape(path), "**", "*.tif"), recursive=True))
+    todo = [p for p in paths if not is_cog(p)]
+    logger.info(f"Converting {len(todo)} of {len(paths)} GeoTIFFs below {path} to COG")
+
+    def convert(p):
+        return to_cog(p, blocksize=blocksize, compress=compress)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(tqdm(executor.map(convert, todo), total=len(todo), desc="Converting to COG", disable=not progress))
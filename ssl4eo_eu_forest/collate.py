@@ -0,0 +1,85 @@
+import math
+import torch
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+from .utils import SEASONS
+
+
+def stack_padded(tensors: Sequence[torch.Tensor], size: Optional[Tuple[int, int]] = None) -> torch.Tensor:
+    """Stack [C, H, W] tensors into one zero-initialized [N, C, H, W] tensor, padding or cropping H and W."""
+    height = size[0] if size else max(t.shape[-2] for t in tensors)
+    width = size[1] if size else max(t.shape[-1] for t in tensors)
+    out = tensors[0].new_zeros((len(tensors), tensors[0].shape[0], height, width))
+    for i, t in enumerate(tensors):
+        h, w = min(t.shape[-2], height), min(t.shape[-1], width)
+        out[i, :, :h, :w] = t[:, :h, :w]
+    return out
+
+
+def collate_seasonal(
+    batch: List[Dict[str, Any]],
+    seasons: Sequence[str] = SEASONS,
+    size: Optional[Tuple[int, int]] = None
+) -> Dict[str, Any]:
+    """DataLoader collate_fn batching samples into a fixed season layout.
+
+    Images land in one preallocated [B, S, C, H, W] tensor with one slot
+    per entry of seasons, the first acquisition of a season wins and
+    missing seasons stay zero. ``season_mask`` [B, S] flags filled slots.
+    H and W default to the largest sample in the batch, smaller samples
+    (e.g. groups with dimensions_match=False) are zero-padded at the
+    bottom and right, ``valid`` [B, H, W] flags the unpadded pixels.
+    Metadata is returned column-wise, transforms as a float64 [B, S, 6]
+    tensor (NaN for missing seasons) and shapes as [B, S, 3].
+    """
+    n, n_seasons = len(batch), len(seasons)
+    first = batch[0]["image"]
+    height = size[0] if size else max(s["image"].shape[-2] for s in batch)
+    width = size[1] if size else max(s["image"].shape[-1] for s in batch)
+
+    image = first.new_zeros((n, n_seasons, first.shape[-3], height, width))
+    mask = batch[0]["mask"].new_zeros((n, batch[0]["mask"].shape[0], height, width))
+    valid = torch.zeros((n, height, width), dtype=torch.bool)
+    season_mask = torch.zeros((n, n_seasons), dtype=torch.bool)
+    transform = torch.full((n, n_seasons, 6), math.nan, dtype=torch.float64)
+    shape = torch.zeros((n, n_seasons, 3), dtype=torch.int64)
+    columns = {key: [[None] * n_seasons for _ in range(n)] for key in ("timestamp_start", "timestamp_end", "tile_id", "crs")}
+    extra = {key: [] for key in batch[0] if key not in ("image", "mask", "metadata", "season_mask")}
+
+    for i, sample in enumerate(batch):
+        h, w = min(sample["mask"].shape[-2], height), min(sample["mask"].shape[-1], width)
+        mask[i, :, :h, :w] = sample["mask"][:, :h, :w]
+        valid[i, :h, :w] = True
+
+        present = sample.get("season_mask")
+        for j, meta in enumerate(sample["metadata"]):
+            if meta["season"] not in seasons or (present is not None and not present[j]):
+                continue
+            slot = seasons.index(meta["season"])
+            if season_mask[i, slot]:
+                continue
+            season_mask[i, slot] = True
+            src = sample["image"][j]
+            h, w = min(src.shape[-2], height), min(src.shape[-1], width)
+            image[i, slot, :, :h, :w] = src[:, :h, :w]
+            for key in columns:
+                columns[key][i][slot] = meta.get(key)
+            if meta.get("transform") is not None:
+                transform[i, slot] = torch.tensor(tuple(meta["transform"])[:6], dtype=torch.float64)
+            shape[i, slot] = torch.tensor(tuple(src.shape))
+
+        for key in extra:
+            extra[key].append(sample[key])
+
+    return {
+        "image": image,
+        "mask": mask,
+        "valid": valid,
+        "season_mask": season_mask,
+        **extra,
+        "metadata": {
+            "season": list(seasons),
+            **columns,
+            "shape": shape,
+            "transform": transform
+        }
+    }
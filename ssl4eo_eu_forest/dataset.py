@@ -1,182 +1,458 @@
 import os
+import time
 import torch
+from contextlib import ExitStack, nullcontext
+from urllib.parse import quote
 import rasterio
+import rasterio.merge
 import requests
+import logging
+import numpy as np
+import pandas as pd
 import shapely
 import geopandas as gpd
-import pandas as pd
-import logging
-import folium
+from rasterio.vrt import WarpedVRT
+from rasterio.windows import Window
 from torchgeo.datasets import GeoDataset
-from datasets import load_dataset
-from huggingface_hub import hf_hub_url
-from typing import Optional, Callable, List, Dict, Any, Union
-
-# Logger setup
+from torchgeo.datasets.utils import GeoSlice
+from typing import TYPE_CHECKING, Optional, Callable, List, Dict, Any, Union, Sequence, Tuple
+from .metadata import load_metadata, load_local_metadata, local_metadata_files, hub_url_prefix, IMAGE_FIELDS
+from .utils import SEASONS, BANDS, band_indexes
+from .decode import read_sample
+from .memcache import SampleCache, crop_sample
+from .download import make_session, download_file, download_files
+from .cache import TileCache
+from .cog import remote_env, vsicurl_path
+from .quicklook import RGB_BANDS, normalize_rgb
+from .instrument import Timings, stage
+
+if TYPE_CHECKING:
+    import folium
+
+# Logger setup, INFO unless configured otherwise. Per-sample messages are
+# DEBUG with lazy %-formatting, so they cost nothing when disabled.
 logger = logging.getLogger("SSL4EOEUForestTG")
-logger.setLevel(logging.DEBUG)
+if logger.level == logging.NOTSET:
+    logger.setLevel(logging.INFO)
 
 if not logger.hasHandlers():
     ch = logging.StreamHandler()
-    ch.setLevel(logging.DEBUG)
     formatter = logging.Formatter("[%(levelname)s] %(message)s")
     ch.setFormatter(formatter)
     logger.addHandler(ch)
 
+# Sentinel-2 10 m ground sampling distance in degrees, the default resolution of bbox queries
+DEFAULT_RES = 10 / 111_320
+
+
+def build_index(df: gpd.GeoDataFrame, images: pd.DataFrame) -> gpd.GeoDataFrame:
+    """Spatiotemporal index with one row per seasonal image, as expected by TorchGeo samplers.
+
+    Rows carry the acquisition interval as ``datetime`` IntervalIndex, the
+    group footprint as geometry and ``position`` pointing back into df.
+    """
+    counts = df["image_count"].to_numpy()
+    positions = np.repeat(np.arange(len(df)), counts)
+
+    starts = pd.to_datetime(images["timestamp_start"].to_numpy(dtype=str), format="%Y%m%dT%H%M%S")
+    ends = pd.to_datetime(images["timestamp_end"].to_numpy(dtype=str), format="%Y%m%dT%H%M%S")
+    interval = pd.IntervalIndex.from_arrays(starts, ends, closed="both", name="datetime")
+
+    return gpd.GeoDataFrame(
+        {
+            "position": positions,
+            "image": np.arange(len(positions)) - np.repeat(df["image_start"].to_numpy(), counts),
+            "group_id": df["group_id"].array.take(positions),
+            "season": images["season"].array,
+            "tile_id": images["tile_id"].array,
+        },
+        index=interval,
+        geometry=df.geometry.values.take(positions),
+        crs=df.crs
+    )
+
 
 class SSL4EOEUForestTG(GeoDataset):
-    """TorchGeo dataset for SSL4EO-EU Forest segmentation with seasonal imagery."""
+    """TorchGeo dataset for SSL4EO-EU Forest segmentation with seasonal imagery.
+
+    The metadata index is cached under ``root/.metadata`` per repo_id and
+    revision, so only the first instantiation streams meta.jsonl from the
+    Hub. Pass ``refresh_metadata=True`` to rebuild it. ``df`` holds one row
+    per group, ``images`` one row per image (``image_start``/``image_count``
+    of a group point into it). Both are memory-mapped Arrow columns rather
+    than Python objects, download URLs are derived from ``url_prefix``.
+
+    Integer indices return the full seasonal stack of one group. TorchGeo
+    ``[xmin:xmax, ymin:ymax, tmin:tmax]`` queries, e.g. from
+    ``RandomGeoSampler`` or ``GridGeoSampler``, mosaic all images in
+    the query window per season, so patches may span group boundaries.
+
+    ``bands`` selects a subset of :data:`~ssl4eo_eu_forest.utils.BANDS` and
+    ``window`` (col_off, row_off, width, height) or ``crop_size`` (random
+    crop per sample) restrict reads to part of each group. Both are passed
+    to rasterio, so unused bands and tiles are never decoded.
+
+    With ``local_dir`` the dataset works offline on a local copy in the
+    layout of :func:`~ssl4eo_eu_forest.utils.process_group`
+    (``masks/<group>/mask.tif``, ``images/<group>/<ts>_<ts>_<tile>/all_bands.tif``)
+    and reads rasters in place. Metadata comes from ``metadata_files``,
+    by default meta.jsonl or its shards in local_dir, and root only holds
+    the metadata cache.
+
+    ``cache_bytes`` > 0 keeps decoded groups in an in-memory LRU cache of
+    that size (cf. :class:`~ssl4eo_eu_forest.memcache.SampleCache`), windows
+    and crops are then cut from the cached groups. Call ``warm_cache``
+    before creating DataLoader workers to share the cache among them.
+
+    ``remote_reads=True`` skips the disk cache and opens mask and image
+    URLs through GDAL ``/vsicurl/``, so windows and band subsets only
+    fetch the tiles they touch via HTTP range requests. ``gdal_options``
+    override :data:`~ssl4eo_eu_forest.cog.VSICURL_OPTIONS`. Range reads
+    pay off for Cloud-Optimized GeoTIFFs, cf.
+    :func:`~ssl4eo_eu_forest.cog.convert_tree_to_cog`.
+
+    Downloaded files are cached under root at their path in the dataset
+    repo (cf. :class:`~ssl4eo_eu_forest.cache.TileCache`), ``cache_quota``
+    bounds the cache size in bytes by evicting the least recently used
+    files. ``tile_cache.verify`` finds truncated or mismatching entries,
+    ``tile_cache.repair`` downloads them again.
+
+    ``instrument=True`` records per-stage timings of every sample in
+    ``timings`` (cf. :class:`~ssl4eo_eu_forest.instrument.Timings`),
+    aggregated across DataLoader workers and exportable for Prometheus.
+    """
 
     def __init__(
         self,
         root: str,
         repo_id: str = "dm4eo/ssl4eo_eu_forest",
         revision: str = "v1.0",
-        transforms: Optional[Callable] = None
+        transforms: Optional[Callable] = None,
+        refresh_metadata: bool = False,
+        bands: Optional[Sequence[str]] = None,
+        window: Optional[Tuple[int, int, int, int]] = None,
+        crop_size: Optional[Union[int, Tuple[int, int]]] = None,
+        local_dir: Optional[str] = None,
+        metadata_files: Optional[Union[str, Sequence[str]]] = None,
+        cache_bytes: int = 0,
+        remote_reads: bool = False,
+        gdal_options: Optional[Dict[str, Any]] = None,
+        instrument: bool = False,
+        cache_quota: Optional[int] = None
     ):
         super().__init__()
         self.root = root
         self.transforms = transforms
+        self.local_dir = local_dir
+        self.sample_cache = SampleCache(cache_bytes) if cache_bytes > 0 else None
+        self.remote_reads = remote_reads and local_dir is None
+        self.gdal_options = dict(gdal_options or {})
+        self.timings = Timings() if instrument else None
+        self.tile_cache = TileCache(root, max_bytes=cache_quota)
+
+        if window is not None and crop_size is not None:
+            raise ValueError("window and crop_size are mutually exclusive")
+        self.bands = list(BANDS) if bands is None else list(bands)
+        self.band_indexes = None if bands is None else self._band_indexes(bands)
+        self.window = None if window is None else Window(*window)
+        self.crop_size = (crop_size, crop_size) if isinstance(crop_size, int) else crop_size
+
+        if local_dir is not None:
+            if metadata_files is None:
+                metadata_files = local_metadata_files(local_dir)
+            elif isinstance(metadata_files, str):
+                metadata_files = [metadata_files]
+            df, images = load_local_metadata(root, list(metadata_files), refresh=refresh_metadata)
+            self.url_prefix = None
+        else:
+            df, images = load_metadata(root, repo_id, revision, refresh=refresh_metadata)
+            self.url_prefix = hub_url_prefix(repo_id, revision)
 
-        logger.info(f"Loading SSL4EO-EU Forest dataset from Hugging Face: {repo_id}@{revision}")
+        self.df = df
+        self.images = images
+        self._group_index = None
+        self.index = build_index(df, images)
+        self._res = (DEFAULT_RES, DEFAULT_RES)
+
+        logger.info("Dataset initialized with %d samples", len(self.df))
+
+    @property
+    def session(self) -> requests.Session:
+        """Pooled HTTP session, created lazily once per (DataLoader worker) process."""
+        if getattr(self, "_session_pid", None) != os.getpid():
+            self._session = make_session()
+            self._session_pid = os.getpid()
+        return self._session
+
+    def _group_files(self, idx: int) -> List[Tuple[Optional[str], str]]:
+        """(url, cache path) pairs of the mask and seasonal images of a sample.
+
+        In local mode url is None and the path points into local_dir.
+        """
+        row = self.df.iloc[idx]
+        images = self._group_images(idx)
+        if self.local_dir is not None:
+            return [
+                (None, os.path.join(self.local_dir, path))
+                for path in [row["mask_path"], *images["path"]]
+            ]
+        return [
+            (self.url(path), self.tile_cache.path(path))
+            for path in [row["mask_path"], *images["path"]]
+        ]
+
+    def _group_images(self, idx: int) -> Dict[str, List[Any]]:
+        """Per-image metadata of a sample as dict of lists, cf. IMAGE_FIELDS."""
+        start, count = self.df["image_start"].iat[idx], self.df["image_count"].iat[idx]
+        images = self.images.iloc[start:start + count]
+        return {key: images[key].tolist() for key in IMAGE_FIELDS}
+
+    def url(self, path: str) -> str:
+        """Download URL of a file of the dataset repo given its relative path."""
+        return self.url_prefix + quote(path)
+
+    def _fetch(self, url: Optional[str], path: str) -> str:
+        if url is None:
+            return path
+        if not os.path.exists(path):
+            logger.debug("Downloading %s from %s", path, url)
+            start = time.perf_counter()
+            download_file(url, path, session=self.session)
+            nbytes = os.path.getsize(path)
+            if self.timings is not None:
+                self.timings.add("download", time.perf_counter() - start, nbytes)
+            self.tile_cache.added(nbytes)
+        else:
+            logger.debug("Using cached %s", path)
+            self.tile_cache.touch(path)
+        return path
+
+    def _source(self, url: Optional[str], path: str) -> str:
+        """Path to open with rasterio: a /vsicurl/ URL for remote reads, otherwise the fetched cache path."""
+        if self.remote_reads and url is not None:
+            return vsicurl_path(url)
+        return self._fetch(url, path)
+
+    def _gdal_env(self):
+        return remote_env(**self.gdal_options) if self.remote_reads else nullcontext()
+
+    def prefetch(self, indices: Optional[Sequence[int]] = None, max_workers: int = 8) -> int:
+        """Download the files of the given samples (default: all) into the cache under root.
+
+        Returns the number of files fetched, files already cached are skipped.
+        """
+        indices = range(len(self)) if indices is None else indices
+        jobs = [job for idx in indices for job in self._group_files(idx) if job[0] is not None]
+        fetched = download_files(jobs, max_workers=max_workers)
+        if self.tile_cache.max_bytes is not None:
+            self.tile_cache.evict()
+        return len(fetched)
+
+    def query(
+        self,
+        region: Optional[Union[shapely.Geometry, Tuple[float, float, float, float]]] = None,
+        seasons: Optional[Union[str, Sequence[str]]] = None,
+        time_range: Optional[Tuple[Any, Any]] = None,
+        tile_ids: Optional[Union[str, Sequence[str]]] = None
+    ) -> np.ndarray:
+        """Integer indices of samples with at least one image matching all given filters.
+
+        region is a geometry or (xmin, ymin, xmax, ymax) tuple in the CRS of
+        the index, time_range a (start, end) pair of anything pandas parses
+        as timestamp.
+        """
+        return np.unique(self.index["position"].to_numpy()[self._query_images(region, seasons, time_range, tile_ids)])
+
+    def _query_images(self, region=None, seasons=None, time_range=None, tile_ids=None) -> np.ndarray:
+        """Positions of matching rows in self.index, sorted."""
+        hits = np.ones(len(self.index), dtype=bool)
+        if region is not None:
+            if isinstance(region, (tuple, list)):
+                region = shapely.box(*region)
+            hits[:] = False
+            hits[self.index.sindex.query(region, predicate="intersects")] = True
+        if seasons is not None:
+            hits &= self.index["season"].isin([seasons] if isinstance(seasons, str) else seasons).to_numpy()
+        if tile_ids is not None:
+            hits &= self.index["tile_id"].isin([tile_ids] if isinstance(tile_ids, str) else tile_ids).to_numpy()
+        if time_range is not None:
+            interval = pd.Interval(pd.Timestamp(time_range[0]), pd.Timestamp(time_range[1]), closed="both")
+            hits &= self.index.index.overlaps(interval)
+        return np.flatnonzero(hits)
+
+    @staticmethod
+    def _band_indexes(bands: Sequence[str]) -> List[int]:
+        """1-based rasterio band indexes of Sentinel-2 band names."""
+        return band_indexes(bands)
+
+    def _sample_window(self, idx: int) -> Optional[Window]:
+        """Fixed window, random crop of crop_size within the mask of sample idx, or None."""
+        if self.crop_size is None:
+            return self.window
+        row = self.df.iloc[idx]
+        height, width = self.crop_size
+        row_off = int(torch.randint(0, max(int(row["mask_height"]) - height, 0) + 1, (1,)))
+        col_off = int(torch.randint(0, max(int(row["mask_width"]) - width, 0) + 1, (1,)))
+        return Window(col_off, row_off, width, height)
 
-        raw_df = pd.DataFrame([
-            row for row in load_dataset(
-                repo_id,
-                trust_remote_code=True,
-                streaming=True,
-                revision=revision
-            )["train"]
-        ])
+    def load_sample(
+        self,
+        idx: int,
+        bands: Optional[Sequence[str]] = None,
+        window: Optional[Tuple[int, int, int, int]] = None
+    ) -> Dict[str, Any]:
+        """Load sample idx, optionally overriding the band subset and pixel window of the dataset."""
+        band_indexes = self.band_indexes if bands is None else self._band_indexes(bands)
+        window = self._sample_window(idx) if window is None else Window(*window)
+        if self.sample_cache is None:
+            sample = self._load_group(idx, band_indexes, window)
+        else:
+            sample = crop_sample(self._cached_group(idx, band_indexes), window)
 
-        raw_df["geometry"] = raw_df.bbox_epsg4326.apply(
-            lambda b: shapely.geometry.box(b[0], b[1], b[2], b[3])
-        )
+        if self.transforms:
+            with stage(self.timings, "transform"):
+                sample = self.transforms(sample)
 
-        df = gpd.GeoDataFrame(
-            raw_df.drop(columns=["bbox_epsg4326"]),
-            geometry="geometry",
-            crs="EPSG:4326"
-        )
+        if self.timings is not None:
+            self.timings.add_sample()
+        return sample
 
-        df["mask_url"] = df.mask_path.apply(
-            lambda mp: hf_hub_url(repo_id=repo_id, filename=mp, repo_type="dataset")
-        )
-        df["image_urls"] = df.images.apply(
-            lambda ims: [
-                hf_hub_url(repo_id=repo_id, filename=path, repo_type="dataset")
-                for path in ims["path"]
-            ]
-        )
+    def _cached_group(self, idx: int, band_indexes: Optional[List[int]]) -> Dict[str, Any]:
+        """Full decoded group from the sample cache, decoded and cached on a miss."""
+        key = (self.df.iloc[idx]["group_id"], tuple(band_indexes or ()))
+        with stage(self.timings, "cache_lookup"):
+            sample = self.sample_cache.get(key)
+        if sample is None:
+            sample = self._load_group(idx, band_indexes)
+            self.sample_cache.put(key, sample)
+        return sample
 
-        self.df = df
-        self.index = list(df.index)
+    def warm_cache(self, indices: Optional[Sequence[int]] = None) -> Dict[str, int]:
+        """Decode samples (default: all) into the sample cache, returns its stats."""
+        if self.sample_cache is None:
+            raise RuntimeError("the sample cache is disabled, pass cache_bytes > 0")
+        indices = range(len(self)) if indices is None else indices
+        for idx in indices:
+            self._cached_group(idx, self.band_indexes)
+        return self.sample_cache.stats()
 
-        logger.info(f"Dataset initialized with {len(self.df)} samples")
+    def __getitem__(self, idx: Union[int, GeoSlice]) -> Dict[str, Any]:
+        if isinstance(idx, (int, np.integer)):
+            return self.load_sample(int(idx))
 
-    def __getitem__(self, idx: int) -> Dict[str, Any]:
-        row = self.df.iloc[idx]
-        group_id = row["group_id"]
-        mask_url = row["mask_url"]
-        image_urls = row["image_urls"]
-        image_meta = row["images"]
-
-        group_dir = os.path.join(self.root, str(group_id))
-        os.makedirs(group_dir, exist_ok=True)
-
-        # Load mask
-        mask_path = os.path.join(group_dir, "mask.tif")
-        if not os.path.exists(mask_path):
-            logger.debug(f"Downloading mask for group {group_id} from {mask_url}")
-            response = requests.get(mask_url)
-            response.raise_for_status()
-            with open(mask_path, "wb") as f:
-                f.write(response.content)
-        else:
-            logger.debug(f"Using cached mask for group {group_id}")
-
-        with rasterio.open(mask_path) as src:
-            mask_array = src.read()
-            mask = torch.from_numpy(mask_array).byte()
-            logger.debug(f"Loaded mask shape: {mask.shape}, dtype: byte")
-
-        # Load seasonal images
-        season_tensors = []
-        metadata = []
-
-        for i, url in enumerate(image_urls):
-            season = image_meta["season"][i]
-            timestamp_start = image_meta["timestamp_start"][i]
-            timestamp_end = image_meta["timestamp_end"][i]
-            tile_id = image_meta["tile_id"][i]
-
-            image_path = os.path.join(group_dir, f"{season}.tif")
-            if not os.path.exists(image_path):
-                logger.debug(f"Downloading {season} image for group {group_id} from {url}")
-                response = requests.get(url)
-                response.raise_for_status()
-                with open(image_path, "wb") as f:
-                    f.write(response.content)
-            else:
-                logger.debug(f"Using cached {season} image for group {group_id}")
-
-            with rasterio.open(image_path) as src:
-                image_array = src.read()
-                image_tensor = torch.from_numpy(image_array).to(torch.uint16)
-                season_tensors.append(image_tensor)
-
-                metadata.append({
-                    "season": season,
-                    "timestamp_start": timestamp_start,
-                    "timestamp_end": timestamp_end,
-                    "tile_id": tile_id,
-                    "shape": image_tensor.shape,
-                    "crs": src.crs.to_string() if src.crs else None,
-                    "transform": src.transform
-                })
-
-                logger.debug(f"Loaded {season} image shape: {image_tensor.shape}, dtype: uint16")
-
-        image = torch.stack(season_tensors, dim=0)
-        logger.debug(f"Final image shape (seasonal stack): {image.shape}")
-
-        sample = {
-            "image": image,
-            "mask": mask,
-            "group_id": group_id,
-            "metadata": metadata
-        }
+        sample = self._load_query(idx)
 
         if self.transforms:
-            sample = self.transforms(sample)
+            with stage(self.timings, "transform"):
+                sample = self.transforms(sample)
+
+        if self.timings is not None:
+            self.timings.add_sample()
+        return sample
+
+    def _load_query(self, query: GeoSlice) -> Dict[str, Any]:
+        """Mosaic mask and per-season images of all groups within a spatiotemporal slice."""
+        x, y, t = self._disambiguate_slice(query)
+        hits = self.index.iloc[self._query_images(region=(x.start, y.start, x.stop, y.stop), time_range=(t.start, t.stop))]
+        if hits.empty:
+            raise IndexError(f"query: {query} not found in index with bounds: {self.bounds}")
+
+        bounds = (x.start, y.start, x.stop, y.stop)
+        res = (x.step, y.step)
+        mask_paths, season_paths = {}, {}
+        for position, image, season in zip(hits["position"], hits["image"], hits["season"]):
+            files = self._group_files(position)
+            mask_paths[position] = self._source(*files[0])
+            season_paths.setdefault(season, []).append(self._source(*files[1 + image]))
+
+        mask = self._merge(list(mask_paths.values()), bounds, res)
+        seasons = [s for s in SEASONS if s in season_paths] + sorted(set(season_paths) - set(SEASONS))
+        image = torch.stack([
+            self._merge(season_paths[season], bounds, res, self.band_indexes).to(torch.uint16)
+            for season in seasons
+        ], dim=0)
+
+        return {
+            "image": image,
+            "mask": mask.byte(),
+            "crs": self.crs,
+            "bounds": query,
+            "group_ids": sorted(hits["group_id"].unique()),
+            "metadata": [{"season": season} for season in seasons]
+        }
 
+    def _merge(
+        self,
+        paths: List[str],
+        bounds: Tuple[float, ...],
+        res: Tuple[float, float],
+        indexes: Optional[List[int]] = None
+    ) -> torch.Tensor:
+        """Warp files to the CRS of the index and merge them within bounds at resolution res."""
+        with ExitStack() as stack:
+            stack.enter_context(self._gdal_env())
+            with stage(self.timings, "open"):
+                vrts = [stack.enter_context(WarpedVRT(stack.enter_context(rasterio.open(path)), crs=self.crs)) for path in paths]
+            with stage(self.timings, "decode"):
+                array, _ = rasterio.merge.merge(vrts, bounds=bounds, res=res, indexes=indexes)
+        return torch.from_numpy(array)
+
+    def _load_group(
+        self,
+        idx: int,
+        band_indexes: Optional[List[int]] = None,
+        window: Optional[Window] = None
+    ) -> Dict[str, Any]:
+        paths = [self._source(url, path) for url, path in self._group_files(idx)]
+        with ExitStack() as stack:
+            stack.enter_context(self._gdal_env())
+            with stage(self.timings, "open"):
+                mask_src, *image_srcs = [stack.enter_context(rasterio.open(path)) for path in paths]
+            return self._read_group(idx, mask_src, image_srcs, band_indexes, window)
+
+    def _read_group(
+        self,
+        idx: int,
+        mask_src: rasterio.DatasetReader,
+        image_srcs: Sequence[rasterio.DatasetReader],
+        band_indexes: Optional[List[int]] = None,
+        window: Optional[Window] = None
+    ) -> Dict[str, Any]:
+        """Sample from open datasets of the mask and the seasonal images of a group, in _group_files order."""
+        row = self.df.iloc[idx]
+        sample = read_sample(
+            mask_src, image_srcs, self._group_images(idx), row["group_id"], band_indexes, window, self.timings
+        )
+        if len({meta["shape"] for meta in sample["metadata"]}) > 1:
+            logger.debug("Zero-padded seasons of group %s to a common shape (dimensions_match=%s)",
+                         row["group_id"], row["dimensions_match"])
         return sample
 
     def __len__(self) -> int:
         return len(self.df)
 
     def rgb_from_samples(self, sample_or_index: Union[int, Dict[str, Any]]) -> Dict[str, Any]:
-        """Extract RGB images and mask from a sample for visualization."""
-        def normalize_band(band: torch.Tensor, lower=2, upper=98) -> torch.Tensor:
-            band = band.float()
-            flat = band.flatten()
-            low = torch.quantile(flat, lower / 100.0)
-            high = torch.quantile(flat, upper / 100.0)
-            band_clipped = torch.clamp(band, min=low.item(), max=high.item())
-            return (band_clipped - low) / (high - low + 1e-5)
+        """Extract RGB images and mask from a sample for visualization.
 
+        Bands are stretched between their 2nd and 98th percentile in one
+        vectorized pass, cf. :func:`~ssl4eo_eu_forest.quicklook.normalize_rgb`,
+        which also batches whole datasets into thumbnails.
+        """
         sample = self[sample_or_index] if isinstance(sample_or_index, int) else sample_or_index
         rgb_dict = {}
 
         seasonal_stack = sample["image"]  # [S, C, H, W]
         seasons = [meta["season"] for meta in sample["metadata"]]
 
+        # Red, green and blue bands (B04, B03, B02) → their position among the selected bands
+        missing = [band for band in RGB_BANDS if band not in self.bands]
+        if missing:
+            raise ValueError(f"RGB quicklooks need bands {missing} which are not selected")
+        rgb_indexes = [self.bands.index(band) for band in RGB_BANDS]
+
+        normalized = normalize_rgb(seasonal_stack[:, rgb_indexes])  # [S, 3, H, W]
         for i, season in enumerate(seasons):
-            # Use Sentinel-2 bands 2, 3, 4 → torch indices [1, 2, 3]
-            rgb_tensor = seasonal_stack[i][1:4]  # [3, H, W]
-            normalized = torch.stack([normalize_band(rgb_tensor[j]) for j in range(3)], dim=0)
-            rgb_np = normalized.permute(1, 2, 0).cpu().numpy()
-            rgb_dict[season] = rgb_np
+            rgb_dict[season] = normalized[i].permute(1, 2, 0).cpu().numpy()
 
         mask_tensor = sample["mask"][0]
         mask_np = mask_tensor.cpu().numpy()
@@ -184,14 +460,15 @@ class SSL4EOEUForestTG(GeoDataset):
 
         return rgb_dict
 
-    def show_bbox_folium(self, sample_or_index: Union[int, Dict[str, Any]]) -> folium.Map:
+    def show_bbox_folium(self, sample_or_index: Union[int, Dict[str, Any]]) -> "folium.Map":
         """Display the bounding box of a sample on an interactive folium map."""
+        import folium
         from shapely.geometry import mapping
 
         if isinstance(sample_or_index, int):
             idx = sample_or_index
         else:
-            idx = self.index[self.df["group_id"] == sample_or_index["group_id"]][0]
+            idx = self.group_position(sample_or_index["group_id"])
 
         geom = self.df.iloc[idx].geometry
         bounds = geom.bounds
@@ -206,3 +483,30 @@ class SSL4EOEUForestTG(GeoDataset):
 
         folium.LayerControl().add_to(m)
         return m
+
+    def group_position(self, group_id: str) -> int:
+        """Integer index of a group_id, a hash lookup built on first use."""
+        if self._group_index is None:
+            self._group_index = pd.Index(self.df["group_id"])
+        return int(self._group_index.get_loc(group_id))
+
+    def show_overview_folium(
+        self,
+        seasons: Optional[Union[str, Sequence[str]]] = None,
+        time_range: Optional[Tuple[Any, Any]] = None,
+        tile_ids: Optional[Union[str, Sequence[str]]] = None,
+        **kwargs
+    ) -> "folium.Map":
+        """Display the footprints of all samples matching the filters (cf. query) on one folium map.
+
+        Large selections are aggregated into a grid of per-cell counts, so
+        the map stays small and responsive, cf.
+        :func:`~ssl4eo_eu_forest.overview.overview_map` for kwargs.
+        """
+        from .overview import overview_map
+
+        if seasons is None and time_range is None and tile_ids is None:
+            df = self.df
+        else:
+            df = self.df.iloc[self.query(seasons=seasons, time_range=time_range, tile_ids=tile_ids)]
+        return overview_map(df, **kwargs)
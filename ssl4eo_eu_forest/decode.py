@@ -0,0 +1,63 @@
+import logging
+import rasterio
+import torch
+from rasterio.windows import Window
+from typing import List, Dict, Any, Optional, Sequence
+from .collate import stack_padded
+from .instrument import Timings, stage
+
+logger = logging.getLogger("SSL4EOEUForestTG")
+
+
+def read_sample(
+    mask_src: rasterio.DatasetReader,
+    image_srcs: Sequence[rasterio.DatasetReader],
+    images: Dict[str, List[Any]],
+    group_id: str,
+    band_indexes: Optional[List[int]] = None,
+    window: Optional[Window] = None,
+    timings: Optional[Timings] = None
+) -> Dict[str, Any]:
+    """Sample from open datasets of the mask and the seasonal images of a group.
+
+    images holds the season, timestamp_start, timestamp_end and tile_id
+    of image_srcs column-wise. Only band_indexes (default: all bands) and
+    window (default: full rasters) are read, seasons of different size
+    are zero-padded to a common shape. Decoding and tensor conversion are
+    timed as stages of timings if given.
+    """
+    with stage(timings, "decode"):
+        mask_array = mask_src.read(window=window)
+    with stage(timings, "to_tensor"):
+        mask = torch.from_numpy(mask_array).byte()
+    logger.debug("Loaded mask shape: %s, dtype: byte", mask.shape)
+
+    season_tensors = []
+    metadata = []
+    for i, src in enumerate(image_srcs):
+        with stage(timings, "decode"):
+            image_array = src.read(indexes=band_indexes, window=window)
+        with stage(timings, "to_tensor"):
+            image_tensor = torch.from_numpy(image_array).to(torch.uint16)
+        season_tensors.append(image_tensor)
+        metadata.append({
+            "season": images["season"][i],
+            "timestamp_start": images["timestamp_start"][i],
+            "timestamp_end": images["timestamp_end"][i],
+            "tile_id": images["tile_id"][i],
+            "shape": image_tensor.shape,
+            "crs": src.crs.to_string() if src.crs else None,
+            "transform": src.transform if window is None else src.window_transform(window)
+        })
+        logger.debug("Loaded %s image shape: %s, dtype: uint16", images["season"][i], image_tensor.shape)
+
+    with stage(timings, "to_tensor"):
+        image = stack_padded(season_tensors)
+    logger.debug("Final image shape (seasonal stack): %s", image.shape)
+
+    return {
+        "image": image,
+        "mask": mask,
+        "group_id": group_id,
+        "metadata": metadata
+    }
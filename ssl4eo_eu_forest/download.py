@@ -0,0 +1,182 @@
+import os
+import re
+import time
+import hashlib
+import logging
+import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from tqdm import tqdm
+from typing import Optional, Iterable, Tuple, List
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, concurrent writers are not serialized
+    fcntl = None
+
+logger = logging.getLogger("SSL4EOEUForestTG")
+
+CHUNK_SIZE = 1 << 20
+
+
+class DownloadError(IOError):
+    """Raised when a file cannot be downloaded completely and verified."""
+
+
+def make_session(pool_size: int = 16) -> requests.Session:
+    """HTTP session with a connection pool large enough for pool_size concurrent downloads."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def _advertised_sha256(response: requests.Response) -> Optional[str]:
+    """SHA256 the Hugging Face Hub advertises for LFS files (on the response or its redirects)."""
+    for r in [*response.history, response]:
+        etag = r.headers.get("X-Linked-Etag", "").strip('"')
+        if re.fullmatch(r"[0-9a-f]{64}", etag):
+            return etag
+    return None
+
+
+def _total_size(response: requests.Response, offset: int) -> Optional[int]:
+    """Full size of the remote file from Content-Range or Content-Length."""
+    content_range = response.headers.get("Content-Range")
+    if content_range and "/" in content_range:
+        total = content_range.rsplit("/", 1)[1]
+        return int(total) if total.isdigit() else None
+    content_length = response.headers.get("Content-Length")
+    if content_length is not None:
+        return offset + int(content_length)
+    return None
+
+
+def _sha256(path: str, chunk_size: int = CHUNK_SIZE) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _fetch_part(
+    session: requests.Session,
+    url: str,
+    f,
+    chunk_size: int,
+    timeout: float
+) -> Tuple[Optional[int], Optional[str]]:
+    """Append the missing bytes of url to the open part file f, resuming at its current size."""
+    f.seek(0, os.SEEK_END)
+    offset = f.tell()
+    headers = {"Range": f"bytes={offset}-"} if offset else {}
+
+    with session.get(url, headers=headers, stream=True, timeout=timeout) as response:
+        if response.status_code == 416:
+            # nothing left to fetch, the part file already holds the whole body
+            return offset, _advertised_sha256(response)
+        response.raise_for_status()
+        if offset and response.status_code != 206:
+            # server ignored the range request, start over
+            f.seek(0)
+            f.truncate()
+            offset = 0
+        total = _total_size(response, offset)
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            f.write(chunk)
+        f.flush()
+        return total, _advertised_sha256(response)
+
+
+def download_file(
+    url: str,
+    path: str,
+    session: Optional[requests.Session] = None,
+    retries: int = 3,
+    backoff: float = 1.0,
+    expected_size: Optional[int] = None,
+    sha256: Optional[str] = None,
+    chunk_size: int = CHUNK_SIZE,
+    timeout: float = 60.0
+) -> str:
+    """Download url to path unless it exists already.
+
+    The body is streamed into ``path + ".part"`` which is renamed onto path
+    only after its size (and SHA256, if given or advertised by the Hub) has
+    been verified. Interrupted downloads resume from the part file with an
+    HTTP range request, failures are retried with exponential backoff.
+    """
+    if os.path.exists(path):
+        return path
+    session = session or make_session(pool_size=1)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    part_path = f"{path}.part"
+
+    for attempt in range(retries + 1):
+        try:
+            with open(part_path, "ab") as f:
+                if fcntl is not None:
+                    # serialize concurrent workers fetching the same file
+                    fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+                if os.path.exists(path):
+                    if f.tell() == 0 and os.path.exists(part_path):
+                        os.remove(part_path)
+                    return path
+
+                total, advertised = _fetch_part(session, url, f, chunk_size, timeout)
+                size = f.tell()
+                expected = expected_size if expected_size is not None else total
+                if expected is not None and size != expected:
+                    if size > expected:
+                        os.remove(part_path)
+                    raise DownloadError(f"{url}: got {size} bytes, expected {expected}")
+                checksum = sha256 or advertised
+                if checksum is not None and _sha256(part_path, chunk_size) != checksum:
+                    os.remove(part_path)
+                    raise DownloadError(f"{url}: SHA256 mismatch")
+                os.replace(part_path, path)
+                return path
+        except (requests.RequestException, DownloadError) as e:
+            if attempt == retries:
+                if os.path.exists(part_path) and os.path.getsize(part_path) == 0:
+                    os.remove(part_path)
+                raise DownloadError(f"Failed to download {url} after {retries + 1} attempts: {e}") from e
+            delay = backoff * 2 ** attempt
+            logger.warning(f"Download of {url} failed ({e}), retrying in {delay:.1f}s")
+            time.sleep(delay)
+    return path
+
+
+def download_files(
+    jobs: Iterable[Tuple[str, str]],
+    max_workers: int = 8,
+    session: Optional[requests.Session] = None,
+    progress: bool = True,
+    **kwargs
+) -> List[str]:
+    """Download (url, path) pairs concurrently through one pooled session.
+
+    Files already present are skipped. All jobs are attempted, a single
+    DownloadError summarizing the failures is raised at the end.
+    """
+    jobs = [(url, path) for url, path in jobs if not os.path.exists(path)]
+    session = session or make_session(pool_size=max_workers)
+    paths, failures = [], []
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(download_file, url, path, session=session, **kwargs): url
+            for url, path in jobs
+        }
+        for future in tqdm(as_completed(futures), total=len(futures), desc="Downloading", disable=not progress):
+            try:
+                paths.append(future.result())
+            except DownloadError as e:
+                logger.error(str(e))
+                failures.append(futures[future])
+
+    if failures:
+        raise DownloadError(f"{len(failures)} of {len(jobs)} downloads failed, e.g. {failures[0]}")
+    return paths
@@ -0,0 +1,112 @@
+import os
+import time
+import multiprocessing
+from contextlib import contextmanager, nullcontext
+from typing import Dict, Iterator, Optional, Sequence
+
+# Stages of loading a sample, in pipeline order
+STAGES = ("cache_lookup", "download", "open", "decode", "to_tensor", "transform")
+
+_NULL_STAGE = nullcontext()
+
+
+class Timings:
+    """Per-stage call counts, seconds and bytes of sample loading.
+
+    Counters live in shared memory, so the timings of DataLoader workers
+    started after the dataset was created add up in the parent process.
+    ``summary`` tells whether loading is network (download), disk (open,
+    decode of local files) or CPU (to_tensor, transform) bound.
+    """
+
+    def __init__(self, stages: Sequence[str] = STAGES):
+        self.stages = tuple(stages)
+        self._slots = {stage: 3 * i for i, stage in enumerate(self.stages)}
+        # count, seconds, bytes per stage
+        self._values = multiprocessing.Array("d", 3 * len(self.stages))
+        self._samples = multiprocessing.Value("q", 0)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time the enclosed block as one call of stage name."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name: str, seconds: float, nbytes: int = 0) -> None:
+        slot = self._slots[name]
+        with self._values.get_lock():
+            self._values[slot] += 1
+            self._values[slot + 1] += seconds
+            self._values[slot + 2] += nbytes
+
+    def add_sample(self) -> None:
+        with self._samples.get_lock():
+            self._samples.value += 1
+
+    def reset(self) -> None:
+        with self._values.get_lock():
+            for i in range(len(self._values)):
+                self._values[i] = 0
+        with self._samples.get_lock():
+            self._samples.value = 0
+
+    @property
+    def samples(self) -> int:
+        return self._samples.value
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """{stage: {"count", "seconds", "bytes", "seconds_per_sample"}} summed over all processes."""
+        with self._values.get_lock():
+            values = list(self._values)
+        samples = max(self.samples, 1)
+        return {
+            stage: {
+                "count": int(values[slot]),
+                "seconds": values[slot + 1],
+                "bytes": int(values[slot + 2]),
+                "seconds_per_sample": values[slot + 1] / samples
+            }
+            for stage, slot in self._slots.items()
+        }
+
+    def __str__(self) -> str:
+        lines = [f"{'stage':14s} {'count':>10s} {'seconds':>10s} {'ms/sample':>10s} {'MiB':>10s}"]
+        for stage, row in self.summary().items():
+            lines.append(
+                f"{stage:14s} {row['count']:10d} {row['seconds']:10.3f} "
+                f"{1000 * row['seconds_per_sample']:10.3f} {row['bytes'] / 2 ** 20:10.1f}"
+            )
+        lines.append(f"{self.samples} samples")
+        return "\n".join(lines)
+
+    def to_prometheus(self, prefix: str = "ssl4eo_eu_forest") -> str:
+        """Counters in the Prometheus text exposition format."""
+        summary = self.summary()
+        lines = []
+        for metric, key, help_text in (
+            ("stage_calls_total", "count", "Calls of a sample loading stage"),
+            ("stage_seconds_total", "seconds", "Seconds spent in a sample loading stage"),
+            ("stage_bytes_total", "bytes", "Bytes processed by a sample loading stage"),
+        ):
+            lines.append(f"# HELP {prefix}_{metric} {help_text}.")
+            lines.append(f"# TYPE {prefix}_{metric} counter")
+            lines.extend(f'{prefix}_{metric}{{stage="{stage}"}} {row[key]}' for stage, row in summary.items())
+        lines.append(f"# HELP {prefix}_samples_total Samples loaded.")
+        lines.append(f"# TYPE {prefix}_samples_total counter")
+        lines.append(f"{prefix}_samples_total {self.samples}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str, prefix: str = "ssl4eo_eu_forest") -> None:
+        """Atomically write the counters for e.g. the node exporter textfile collector."""
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(self.to_prometheus(prefix))
+        os.replace(tmp_path, path)
+
+
+def stage(timings: Optional[Timings], name: str):
+    """timings.stage(name), or a no-op context when instrumentation is off."""
+    return _NULL_STAGE if timings is None else timings.stage(name)
@@ -0,0 +1,182 @@
+import os
+import random
+import logging
+import rasterio
+import requests
+from collections import deque
+from contextlib import ExitStack
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+from rasterio.windows import Window
+from torch.utils.data import IterableDataset, get_worker_info
+from typing import Optional, Callable, Sequence, Union, Tuple, Iterator, Dict, Any
+from .metadata import load_dataset, hub_url_prefix, local_metadata_files, _read_rows, _images_as_columns
+from .utils import BANDS, band_indexes
+from .decode import read_sample
+from .cache import TileCache
+from .sharding import worker_shard
+from .download import make_session, download_file
+
+logger = logging.getLogger("SSL4EOEUForestTG")
+
+
+def shuffled(items: Iterator[Any], buffer_size: int, rng: random.Random) -> Iterator[Any]:
+    """Approximately shuffle a stream with a buffer of buffer_size items (0: unchanged order)."""
+    if buffer_size <= 0:
+        yield from items
+        return
+    buffer = []
+    for item in items:
+        if len(buffer) < buffer_size:
+            buffer.append(item)
+            continue
+        i = rng.randrange(buffer_size)
+        yield buffer[i]
+        buffer[i] = item
+    rng.shuffle(buffer)
+    yield from buffer
+
+
+class SSL4EOEUForestStream(IterableDataset):
+    """Streaming counterpart of SSL4EOEUForestTG, without a metadata index.
+
+    Metadata rows are pulled lazily from the Hub (``load_dataset(...,
+    streaming=True)``) or from local meta.jsonl/Parquet files, so the first
+    sample arrives after reading one row and memory does not grow with the
+    dataset. Rows pass a shuffle buffer of shuffle_buffer rows (reseeded
+    per epoch, cf. ``set_epoch``) and their rasters are loaded by prefetch
+    threads ahead of the consumer. Local rows are split round-robin across
+    DataLoader workers, the Hub stream by its shards, so workers beyond
+    the number of shards stay idle. Downloads go to the same tile cache
+    under root as SSL4EOEUForestTG, local_dir reads a local copy in place.
+
+    Samples have the keys and layout of ``SSL4EOEUForestTG.load_sample``,
+    bands, window, crop_size and transforms behave the same.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        repo_id: str = "dm4eo/ssl4eo_eu_forest",
+        revision: str = "v1.0",
+        transforms: Optional[Callable] = None,
+        bands: Optional[Sequence[str]] = None,
+        window: Optional[Tuple[int, int, int, int]] = None,
+        crop_size: Optional[Union[int, Tuple[int, int]]] = None,
+        local_dir: Optional[str] = None,
+        metadata_files: Optional[Union[str, Sequence[str]]] = None,
+        shuffle_buffer: int = 0,
+        seed: int = 0,
+        prefetch: int = 4,
+        cache_quota: Optional[int] = None
+    ):
+        super().__init__()
+        if window is not None and crop_size is not None:
+            raise ValueError("window and crop_size are mutually exclusive")
+        self.root = root
+        self.repo_id = repo_id
+        self.revision = revision
+        self.transforms = transforms
+        self.bands = list(BANDS) if bands is None else list(bands)
+        self.band_indexes = None if bands is None else band_indexes(bands)
+        self.window = None if window is None else Window(*window)
+        self.crop_size = (crop_size, crop_size) if isinstance(crop_size, int) else crop_size
+        self.local_dir = local_dir
+        if local_dir is not None and metadata_files is None:
+            metadata_files = local_metadata_files(local_dir)
+        self.metadata_files = [metadata_files] if isinstance(metadata_files, str) else metadata_files
+        self.shuffle_buffer = shuffle_buffer
+        self.seed = seed
+        self.prefetch = max(1, prefetch)
+        self.epoch = 0
+        self.tile_cache = TileCache(root, max_bytes=cache_quota)
+        self.url_prefix = None
+
+    def set_epoch(self, epoch: int) -> None:
+        self.epoch = epoch
+
+    def _hub_stream(self):
+        """The streaming Hub dataset, which hands each DataLoader worker only its own shards."""
+        return load_dataset(self.repo_id, trust_remote_code=True, streaming=True, revision=self.revision)["train"]
+
+    def rows(self) -> Iterator[Dict[str, Any]]:
+        """Metadata rows in stream order."""
+        if self.metadata_files is not None:
+            return (row for path in self.metadata_files for row in _read_rows(path))
+        return iter(self._hub_stream())
+
+    @property
+    def session(self) -> requests.Session:
+        """Pooled HTTP session, created lazily once per (DataLoader worker) process."""
+        if getattr(self, "_session_pid", None) != os.getpid():
+            self._session = make_session(pool_size=self.prefetch)
+            self._session_pid = os.getpid()
+        return self._session
+
+    def _fetch(self, path: str) -> str:
+        """Local path of a file of the dataset repo, downloaded into the tile cache if needed."""
+        if self.local_dir is not None:
+            return os.path.join(self.local_dir, path)
+        cache_path = self.tile_cache.path(path)
+        if os.path.exists(cache_path):
+            self.tile_cache.touch(cache_path)
+            return cache_path
+        if self.url_prefix is None:
+            self.url_prefix = hub_url_prefix(self.repo_id, self.revision)
+        download_file(self.url_prefix + quote(path), cache_path, session=self.session)
+        self.tile_cache.added(os.path.getsize(cache_path))
+        return cache_path
+
+    def _sample_window(self, row: Dict[str, Any], rng: random.Random) -> Optional[Window]:
+        if self.crop_size is None:
+            return self.window
+        height, width = self.crop_size
+        row_off = rng.randint(0, max(int(row["mask_height"]) - height, 0))
+        col_off = rng.randint(0, max(int(row["mask_width"]) - width, 0))
+        return Window(col_off, row_off, width, height)
+
+    def load_row(self, row: Dict[str, Any], window: Optional[Window] = None) -> Dict[str, Any]:
+        """Sample of one metadata row, read through window if given."""
+        images = _images_as_columns(row["images"])
+        with ExitStack() as stack:
+            mask_src = stack.enter_context(rasterio.open(self._fetch(row["mask_path"])))
+            image_srcs = [stack.enter_context(rasterio.open(self._fetch(path))) for path in images["path"]]
+            sample = read_sample(mask_src, image_srcs, images, row["group_id"], self.band_indexes, window)
+        if self.transforms:
+            sample = self.transforms(sample)
+        return sample
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        info = get_worker_info()
+        worker_id = 0 if info is None else info.id
+        rng = random.Random(f"{self.seed}-{self.epoch}")
+        if self.metadata_files is not None:
+            # same shuffle of the stream in every worker, each keeps every num_workers-th row
+            rows = worker_shard(shuffled(self.rows(), self.shuffle_buffer, rng))
+        else:
+            # the Hub stream is already split by shards across workers
+            stream = self._hub_stream()
+            if info is not None and info.id == 0 and stream.n_shards < info.num_workers:
+                logger.warning(
+                    "The Hub stream has %d shards, %d of %d DataLoader workers get no samples",
+                    stream.n_shards, info.num_workers - stream.n_shards, info.num_workers
+                )
+            rows = shuffled(iter(stream), self.shuffle_buffer, rng)
+        window_rng = random.Random(f"{self.seed}-{self.epoch}-{worker_id}")
+
+        executor = ThreadPoolExecutor(max_workers=self.prefetch)
+        pending = deque()
+        yielded = 0
+        try:
+            for row in rows:
+                if not _images_as_columns(row["images"])["path"]:
+                    continue
+                pending.append(executor.submit(self.load_row, row, self._sample_window(row, window_rng)))
+                # the look-ahead grows with each sample up to prefetch, so the first one has the CPU to itself
+                if len(pending) > min(yielded, self.prefetch - 1):
+                    yield pending.popleft().result()
+                    yielded += 1
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
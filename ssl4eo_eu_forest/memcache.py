@@ -0,0 +1,179 @@
+import os
+import bisect
+import threading
+import multiprocessing
+import torch
+from collections import OrderedDict
+from typing import Dict, Any, Hashable, Optional, List, Tuple
+from affine import Affine
+from rasterio.windows import Window
+
+
+def sample_nbytes(sample: Dict[str, Any]) -> int:
+    """Bytes held by the tensors of a sample."""
+    return sum(v.element_size() * v.nelement() for v in sample.values() if isinstance(v, torch.Tensor))
+
+
+def crop_sample(sample: Dict[str, Any], window: Optional[Window]) -> Dict[str, Any]:
+    """Copy of a decoded group sample restricted to a pixel window, cached tensors are never handed out."""
+    if window is None:
+        rows, cols = slice(None), slice(None)
+    else:
+        rows = slice(int(window.row_off), int(window.row_off + window.height))
+        cols = slice(int(window.col_off), int(window.col_off + window.width))
+
+    image = sample["image"][..., rows, cols].clone()
+    metadata = []
+    for meta in sample["metadata"]:
+        meta = dict(meta)
+        meta["shape"] = image.shape[1:]
+        if window is not None and meta.get("transform") is not None:
+            meta["transform"] = meta["transform"] * Affine.translation(window.col_off, window.row_off)
+        metadata.append(meta)
+
+    return {
+        **sample,
+        "image": image,
+        "mask": sample["mask"][..., rows, cols].clone(),
+        "metadata": metadata
+    }
+
+
+# Alignment of tensors packed into the shared arena
+_ALIGN = 64
+
+
+def _aligned(nbytes: int) -> int:
+    return -(-nbytes // _ALIGN) * _ALIGN
+
+
+class SampleCache:
+    """Bounded LRU cache of decoded samples with a byte budget.
+
+    Tensors are copied into one shared-memory arena of max_bytes, allocated
+    lazily on the first put, so entries added before DataLoader workers
+    start (cf. ``SSL4EOEUForestTG.warm_cache``) are shared by all of them
+    instead of being copied, through a single file descriptor rather than
+    one per tensor. Entries added within a worker, or while worker
+    processes are alive, stay private to their process so no process
+    overwrites arena memory another one still reads. Hit and miss counters
+    live in shared memory and aggregate across workers.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._entries: "OrderedDict[Hashable, Dict[str, Any]]" = OrderedDict()
+        self._spans: Dict[Hashable, Tuple[int, int]] = {}
+        self._arena: Optional[torch.Tensor] = None
+        self._free: List[Tuple[int, int]] = []
+        self._owner = os.getpid()
+        self._lock = threading.Lock()
+        self._hits = multiprocessing.Value("q", 0)
+        self._misses = multiprocessing.Value("q", 0)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def get(self, key: Hashable) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            sample = self._entries.get(key)
+            if sample is not None:
+                self._entries.move_to_end(key)
+        counter = self._misses if sample is None else self._hits
+        with counter.get_lock():
+            counter.value += 1
+        return sample
+
+    def _shareable(self) -> bool:
+        # workers inherit the arena but not the allocator state of other processes
+        return os.getpid() == self._owner and not multiprocessing.active_children()
+
+    def _allocate(self, size: int) -> Optional[int]:
+        """Offset of a free arena range of size bytes (first fit), or None."""
+        if self._arena is None:
+            self._arena = torch.empty(0, dtype=torch.uint8).set_(torch.UntypedStorage._new_shared(_aligned(self.max_bytes)))
+            self._free = [(0, len(self._arena))]
+        for i, (offset, free) in enumerate(self._free):
+            if free >= size:
+                if free == size:
+                    del self._free[i]
+                else:
+                    self._free[i] = (offset + size, free - size)
+                return offset
+        return None
+
+    def _release(self, offset: int, size: int) -> None:
+        i = bisect.bisect(self._free, (offset, size))
+        self._free.insert(i, (offset, size))
+        # merge with the following and preceding free ranges
+        if i + 1 < len(self._free) and offset + size == self._free[i + 1][0]:
+            self._free[i] = (offset, size + self._free.pop(i + 1)[1])
+        if i > 0 and self._free[i - 1][0] + self._free[i - 1][1] == offset:
+            self._free[i - 1] = (self._free[i - 1][0], self._free[i - 1][1] + self._free.pop(i)[1])
+
+    def _remove(self, key: Hashable) -> None:
+        self.nbytes -= sample_nbytes(self._entries.pop(key))
+        span = self._spans.pop(key, None)
+        if span is not None:
+            self._release(*span)
+
+    def _pack(self, sample: Dict[str, Any], offset: int) -> Dict[str, Any]:
+        """Copy of sample whose tensors are views into the arena from offset on."""
+        packed = dict(sample)
+        for name, value in sample.items():
+            if isinstance(value, torch.Tensor):
+                nbytes = value.element_size() * value.nelement()
+                view = self._arena[offset:offset + nbytes].view(value.dtype).view(value.shape)
+                view.copy_(value)
+                packed[name] = view
+                offset += _aligned(nbytes)
+        return packed
+
+    def put(self, key: Hashable, sample: Dict[str, Any]) -> None:
+        nbytes = sample_nbytes(sample)
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            while self._entries and self.nbytes + nbytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+            if self._shareable():
+                size = sum(_aligned(v.element_size() * v.nelement()) for v in sample.values() if isinstance(v, torch.Tensor))
+                offset = self._allocate(size)
+                # evict until a contiguous range is free
+                while offset is None and self._spans:
+                    self._remove(next(k for k in self._entries if k in self._spans))
+                    offset = self._allocate(size)
+                if offset is not None:
+                    sample = self._pack(sample, offset)
+                    self._spans[key] = (offset, size)
+            self._entries[key] = sample
+            self.nbytes += nbytes
+
+    def clear(self) -> None:
+        with self._lock:
+            for key in list(self._entries):
+                self._remove(key)
+
+    def stats(self) -> Dict[str, int]:
+        """Hits and misses summed over all processes, entries and bytes of this process."""
+        return {
+            "hits": self._hits.value,
+            "misses": self._misses.value,
+            "entries": len(self._entries),
+            "bytes": self.nbytes
+        }
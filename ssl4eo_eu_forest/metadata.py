@@ -0,0 +1,240 @@
+import os
+import re
+import glob
+import json
+import hashlib
+import uuid
+import logging
+import shapely
+import numpy as np
+import geopandas as gpd
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+from typing import Optional, Iterable, Iterator, Sequence, List, Dict, Any, Union, Tuple
+
+logger = logging.getLogger("SSL4EOEUForestTG")
+
+# Bump whenever the layout of the cached metadata tables changes.
+METADATA_CACHE_VERSION = 2
+
+# Schema metadata key pairing the group and image tables of one cache build
+BUILD_ID_KEY = b"ssl4eo_eu_forest.build_id"
+
+# Per-image fields of a metadata row
+IMAGE_FIELDS = ("path", "timestamp_start", "timestamp_end", "tile_id", "season", "width", "height")
+
+# Columns of the group table holding bbox_epsg4326
+BBOX_COLUMNS = ("minx", "miny", "maxx", "maxy")
+
+
+def metadata_cache_path(root: str, repo_id: str, revision: str) -> str:
+    """Location of the cached metadata index for a given repo_id and revision under root."""
+    key = re.sub(r"[^A-Za-z0-9_.-]+", "__", f"{repo_id}@{revision}")
+    return os.path.join(root, ".metadata", f"{key}.v{METADATA_CACHE_VERSION}.feather")
+
+
+def load_dataset(*args, **kwargs):
+    """datasets.load_dataset, imported on first use to keep the package import light."""
+    from datasets import load_dataset
+    return load_dataset(*args, **kwargs)
+
+
+def hub_url_prefix(repo_id: str, revision: str) -> str:
+    """URL prefix of files in a Hub dataset repo, append the quoted relative path to get a download URL."""
+    from huggingface_hub import hf_hub_url
+    return hf_hub_url(repo_id=repo_id, filename="", repo_type="dataset", revision=revision)
+
+
+def metadata_tables(rows: Iterable[Dict[str, Any]]) -> Tuple[pa.Table, pa.Table]:
+    """Columnar group and image tables from meta.jsonl rows.
+
+    The group table has one row per group with the scalar fields of a
+    row, bbox_epsg4326 as BBOX_COLUMNS and ``image_start``/``image_count``
+    offsets into the image table, which has one row per image with
+    IMAGE_FIELDS in group order.
+    """
+    groups, bboxes, counts = [], [], []
+    images = {key: [] for key in IMAGE_FIELDS}
+    for row in rows:
+        row_images = _images_as_columns(row["images"])
+        for key in IMAGE_FIELDS:
+            images[key].extend(row_images[key])
+        counts.append(len(row_images["path"]))
+        bboxes.append(row["bbox_epsg4326"])
+        groups.append({key: value for key, value in row.items() if key not in ("images", "bbox_epsg4326")})
+
+    bbox = np.asarray(bboxes, dtype=np.float64).reshape(-1, 4)
+    counts = np.asarray(counts, dtype=np.int64)
+    group_table = pa.Table.from_pylist(groups)
+    for i, column in enumerate(BBOX_COLUMNS):
+        group_table = group_table.append_column(column, pa.array(bbox[:, i]))
+    group_table = group_table.append_column("image_start", pa.array(np.cumsum(counts) - counts))
+    group_table = group_table.append_column("image_count", pa.array(counts))
+    return group_table, pa.table(images)
+
+
+def _images_as_columns(images: Union[List[Dict[str, Any]], Dict[str, List[Any]]]) -> Dict[str, List[Any]]:
+    if isinstance(images, dict):
+        return images
+    return {key: [image[key] for image in images] for key in IMAGE_FIELDS}
+
+
+def _arrow_strings(dtype: pa.DataType):
+    # keep strings in (memory-mapped) Arrow buffers instead of one Python object per value
+    if pa.types.is_string(dtype) or pa.types.is_large_string(dtype):
+        return pd.ArrowDtype(dtype)
+    return None
+
+
+def metadata_frames(groups: pa.Table, images: pa.Table) -> Tuple[gpd.GeoDataFrame, pd.DataFrame]:
+    """Group GeoDataFrame with footprint geometries and the image DataFrame of metadata tables.
+
+    Geometries are built with one vectorized shapely.box call, string
+    columns stay Arrow-backed so forked workers share their pages.
+    """
+    df = groups.to_pandas(types_mapper=_arrow_strings)
+    bbox = df[list(BBOX_COLUMNS)].to_numpy(dtype=np.float64)
+    df = gpd.GeoDataFrame(
+        df.drop(columns=list(BBOX_COLUMNS)),
+        geometry=shapely.box(bbox[:, 0], bbox[:, 1], bbox[:, 2], bbox[:, 3]),
+        crs="EPSG:4326"
+    )
+    return df, images.to_pandas(types_mapper=_arrow_strings)
+
+
+def metadata_from_hub(repo_id: str, revision: str) -> Tuple[pa.Table, pa.Table]:
+    """Stream meta.jsonl from the Hugging Face Hub into group and image tables."""
+    return metadata_tables(
+        load_dataset(
+            repo_id,
+            trust_remote_code=True,
+            streaming=True,
+            revision=revision
+        )["train"]
+    )
+
+
+def local_metadata_files(local_dir: str) -> List[str]:
+    """Metadata files of a local tree, preferring meta-*-of-* shards over a single meta file."""
+    for pattern in ("meta-*-of-*.parquet", "meta-*-of-*.jsonl", "meta.parquet", "meta.jsonl"):
+        paths = sorted(glob.glob(os.path.join(glob.escape(local_dir), pattern)))
+        if paths:
+            return paths
+    raise FileNotFoundError(f"No meta.jsonl or metadata shards found in {local_dir}")
+
+
+def _read_rows(path: str) -> Iterator[Dict[str, Any]]:
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches():
+            yield from batch.to_pylist()
+    else:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def metadata_from_local(paths: Sequence[str]) -> Tuple[pa.Table, pa.Table]:
+    """Read local meta.jsonl (or Parquet) files into group and image tables."""
+    return metadata_tables(row for path in paths for row in _read_rows(path))
+
+
+def local_metadata_cache_path(root: str, paths: Sequence[str]) -> str:
+    """Location of the cached metadata index of local metadata files, keyed by their path, mtime and size."""
+    fingerprint = hashlib.sha1()
+    for path in paths:
+        stat = os.stat(path)
+        fingerprint.update(f"{os.path.abspath(path)}:{stat.st_mtime_ns}:{stat.st_size}\n".encode())
+    return os.path.join(root, ".metadata", f"local-{fingerprint.hexdigest()[:16]}.v{METADATA_CACHE_VERSION}.feather")
+
+
+def _images_cache_path(path: str) -> str:
+    return f"{path[:-len('.feather')]}.images.feather"
+
+
+def _build_id(table: pa.Table) -> Optional[bytes]:
+    return (table.schema.metadata or {}).get(BUILD_ID_KEY)
+
+
+def read_metadata_cache(path: str) -> Optional[Tuple[pa.Table, pa.Table]]:
+    """Memory-map cached group and image tables.
+
+    Returns None if they are missing, unreadable or come from different
+    builds, e.g. when a concurrent rebuild replaced only one of them.
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        groups = feather.read_table(path, memory_map=True)
+        images = feather.read_table(_images_cache_path(path), memory_map=True)
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable metadata cache {path}: {e}")
+        return None
+    if _build_id(groups) is None or _build_id(groups) != _build_id(images):
+        logger.warning(f"Ignoring metadata cache {path} whose tables come from different builds")
+        return None
+    return groups, images
+
+
+def write_metadata_cache(tables: Tuple[pa.Table, pa.Table], path: str) -> None:
+    """Atomically write group and image tables as uncompressed Arrow IPC so they can be memory-mapped.
+
+    The image table is written first, the group table at path marks a complete cache.
+    Both carry the same random build id in their schema metadata, so readers
+    can tell tables of concurrent builds apart.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    build_id = uuid.uuid4().hex.encode()
+    groups, images = (
+        table.replace_schema_metadata({**(table.schema.metadata or {}), BUILD_ID_KEY: build_id})
+        for table in tables
+    )
+    for table, table_path in ((images, _images_cache_path(path)), (groups, path)):
+        tmp_path = f"{table_path}.{os.getpid()}.tmp"
+        try:
+            feather.write_feather(table, tmp_path, compression="uncompressed")
+            os.replace(tmp_path, table_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+
+def load_metadata(
+    root: str,
+    repo_id: str,
+    revision: str,
+    refresh: bool = False
+) -> Tuple[gpd.GeoDataFrame, pd.DataFrame]:
+    """Load group and image metadata from the cache under root, building it from the Hub on a miss."""
+    cache_path = metadata_cache_path(root, repo_id, revision)
+    tables = None if refresh else read_metadata_cache(cache_path)
+    if tables is not None:
+        logger.info(f"Loaded cached metadata index from {cache_path}")
+        return metadata_frames(*tables)
+
+    logger.info(f"Loading SSL4EO-EU Forest dataset from Hugging Face: {repo_id}@{revision}")
+    tables = metadata_from_hub(repo_id, revision)
+    write_metadata_cache(tables, cache_path)
+    logger.info(f"Cached metadata index at {cache_path}")
+    return metadata_frames(*tables)
+
+
+def load_local_metadata(
+    root: str,
+    paths: Sequence[str],
+    refresh: bool = False
+) -> Tuple[gpd.GeoDataFrame, pd.DataFrame]:
+    """Load group and image metadata of local metadata files, cached under root until the files change."""
+    cache_path = local_metadata_cache_path(root, paths)
+    tables = None if refresh else read_metadata_cache(cache_path)
+    if tables is not None:
+        logger.info(f"Loaded cached metadata index from {cache_path}")
+        return metadata_frames(*tables)
+
+    logger.info(f"Loading SSL4EO-EU Forest metadata from {', '.join(paths)}")
+    tables = metadata_from_local(paths)
+    write_metadata_cache(tables, cache_path)
+    logger.info(f"Cached metadata index at {cache_path}")
+    return metadata_frames(*tables)
@@ -0,0 +1,105 @@
+import math
+import logging
+import folium
+import numpy as np
+import shapely
+import geopandas as gpd
+from branca.colormap import LinearColormap
+from typing import Optional, Dict, Any
+
+logger = logging.getLogger("SSL4EOEUForestTG")
+
+
+def footprint_grid(
+    df: gpd.GeoDataFrame,
+    cell_size: Optional[float] = None,
+    max_cells: int = 5000
+) -> gpd.GeoDataFrame:
+    """Count footprints per square grid cell (in degrees) by their centroid.
+
+    Without cell_size the smallest power-of-two cell size (>= 1/64 degree)
+    yielding at most max_cells occupied cells is used, so the result stays
+    bounded regardless of the number of footprints. The cell size used is
+    kept in ``attrs["cell_size"]``.
+    """
+    bounds = df.geometry.bounds.to_numpy()
+    centers = np.stack([(bounds[:, 0] + bounds[:, 2]) / 2, (bounds[:, 1] + bounds[:, 3]) / 2], axis=1)
+
+    size = 1 / 64 if cell_size is None else cell_size
+    while True:
+        cells, counts = np.unique(np.floor(centers / size).astype(np.int64), axis=0, return_counts=True)
+        if cell_size is not None or len(cells) <= max_cells:
+            break
+        size *= 2
+
+    grid = gpd.GeoDataFrame(
+        {"count": counts},
+        geometry=shapely.box(cells[:, 0] * size, cells[:, 1] * size, (cells[:, 0] + 1) * size, (cells[:, 1] + 1) * size),
+        crs=df.crs
+    )
+    grid.attrs["cell_size"] = size
+    return grid
+
+
+def _footprints_geojson(df: gpd.GeoDataFrame, precision: int = 5) -> Dict[str, Any]:
+    # bbox rings straight from the bounds array, rounded to ~1 m
+    bounds = np.round(df.geometry.bounds.to_numpy(), precision).tolist()
+    return {
+        "type": "FeatureCollection",
+        "features": [
+            {
+                "type": "Feature",
+                "properties": {"group_id": group_id},
+                "geometry": {
+                    "type": "Polygon",
+                    "coordinates": [[[x0, y0], [x1, y0], [x1, y1], [x0, y1], [x0, y0]]]
+                }
+            }
+            for group_id, (x0, y0, x1, y1) in zip(df["group_id"].tolist(), bounds)
+        ]
+    }
+
+
+def overview_map(
+    df: gpd.GeoDataFrame,
+    max_footprints: int = 2000,
+    cell_size: Optional[float] = None,
+    max_cells: int = 5000
+) -> folium.Map:
+    """Folium map of many group footprints with bounded HTML size.
+
+    Up to max_footprints footprints are drawn as bounding boxes with their
+    group_id as tooltip, more are aggregated into a grid of per-cell counts
+    (cf. :func:`footprint_grid`).
+    """
+    if df.empty:
+        raise ValueError("no footprints to show")
+    xmin, ymin, xmax, ymax = df.total_bounds
+    m = folium.Map(tiles="OpenStreetMap")
+    m.fit_bounds([[ymin, xmin], [ymax, xmax]])
+
+    if len(df) <= max_footprints:
+        folium.GeoJson(
+            _footprints_geojson(df), name=f"Footprints ({len(df)})",
+            style_function=lambda x: {"color": "red", "weight": 1, "fillOpacity": 0.1},
+            tooltip=folium.GeoJsonTooltip(fields=["group_id"])
+        ).add_to(m)
+    else:
+        grid = footprint_grid(df, cell_size, max_cells)
+        colormap = LinearColormap(
+            ["#ffffcc", "#fd8d3c", "#800026"], vmin=1, vmax=max(1, math.log10(grid["count"].max()) + 1)
+        )
+        colormap.caption = "log10(footprints per cell) + 1"
+        folium.GeoJson(
+            grid.__geo_interface__,
+            name=f"Footprints per {grid.attrs['cell_size']:g}° cell ({len(df)})",
+            style_function=lambda feature: {
+                "color": None, "weight": 0, "fillOpacity": 0.6,
+                "fillColor": colormap(math.log10(feature["properties"]["count"]) + 1)
+            },
+            tooltip=folium.GeoJsonTooltip(fields=["count"])
+        ).add_to(m)
+        colormap.add_to(m)
+
+    folium.LayerControl().add_to(m)
+    return m
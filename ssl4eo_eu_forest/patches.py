@@ -0,0 +1,132 @@
+import os
+import hashlib
+import logging
+import numpy as np
+import rasterio
+from concurrent.futures import ThreadPoolExecutor
+from torch.utils.data import Dataset
+from tqdm import tqdm
+from typing import Optional, Dict, Any
+
+logger = logging.getLogger("SSL4EOEUForestTG")
+
+PATCH_INDEX_VERSION = 1
+
+PATCH_DTYPE = np.dtype([("group", "<i4"), ("row", "<i4"), ("col", "<i4"), ("forest_fraction", "<f4")])
+
+
+def patch_index_path(dataset, patch_size: int, stride: int) -> str:
+    """Cache location of the patch index of a dataset under its root, keyed by groups and grid."""
+    key = hashlib.sha1()
+    for column in ("group_id", "mask_height", "mask_width"):
+        key.update("\n".join(map(str, dataset.df[column].tolist())).encode())
+    name = f"{key.hexdigest()[:16]}-{patch_size}-{stride}.v{PATCH_INDEX_VERSION}.npy"
+    return os.path.join(dataset.root, ".patches", name)
+
+
+def _group_patches(dataset, idx: int, patch_size: int, stride: int) -> np.ndarray:
+    url, path = dataset._group_files(idx)[0]
+    with dataset._gdal_env(), rasterio.open(dataset._source(url, path)) as src:
+        forest = (src.read(1) > 0).astype(np.int32)
+
+    # integral image, so every patch sum is four lookups
+    integral = np.zeros((forest.shape[0] + 1, forest.shape[1] + 1), dtype=np.int32)
+    integral[1:, 1:] = forest.cumsum(0).cumsum(1)
+    rows = np.arange(0, forest.shape[0] - patch_size + 1, stride)
+    cols = np.arange(0, forest.shape[1] - patch_size + 1, stride)
+    r, c = [a.ravel() for a in np.meshgrid(rows, cols, indexing="ij")]
+    sums = (
+        integral[r + patch_size, c + patch_size] - integral[r, c + patch_size]
+        - integral[r + patch_size, c] + integral[r, c]
+    )
+
+    patches = np.empty(len(r), dtype=PATCH_DTYPE)
+    patches["group"] = idx
+    patches["row"] = r
+    patches["col"] = c
+    patches["forest_fraction"] = sums / patch_size ** 2
+    return patches
+
+
+def build_patch_index(dataset, patch_size: int = 64, stride: Optional[int] = None, max_workers: int = 8) -> np.ndarray:
+    """All (group, row, col) patches of a dataset on a regular grid with the forest fraction of their mask window."""
+    stride = patch_size if stride is None else stride
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        parts = list(tqdm(
+            executor.map(lambda idx: _group_patches(dataset, idx, patch_size, stride), range(len(dataset))),
+            total=len(dataset), desc="Indexing patches"
+        ))
+    return np.concatenate(parts) if parts else np.empty(0, dtype=PATCH_DTYPE)
+
+
+def load_patch_index(
+    dataset,
+    patch_size: int = 64,
+    stride: Optional[int] = None,
+    refresh: bool = False,
+    max_workers: int = 8
+) -> np.ndarray:
+    """Memory-mapped patch index of a dataset, built once and cached under ``root/.patches``."""
+    stride = patch_size if stride is None else stride
+    path = patch_index_path(dataset, patch_size, stride)
+    if not refresh and os.path.exists(path):
+        logger.info("Loaded cached patch index from %s", path)
+        return np.load(path, mmap_mode="r")
+
+    patches = build_patch_index(dataset, patch_size, stride, max_workers)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.save(f, patches)
+    os.replace(tmp_path, path)
+    logger.info("Cached patch index with %d patches at %s", len(patches), path)
+    return np.load(path, mmap_mode="r")
+
+
+class SSL4EOEUForestPatches(Dataset):
+    """Fixed-size patches of an SSL4EOEUForestTG, each served by a windowed read.
+
+    The (group, row, col) index of all patches on a grid with the given
+    stride (default: patch_size, i.e. non-overlapping) is built once from
+    the masks and cached under the root of the dataset. Patches whose
+    mask window has a forest fraction below min_forest_fraction are
+    skipped. Samples carry the keys of the dataset plus ``patch`` (row,
+    col) and ``forest_fraction``, bands, sample cache and transforms
+    follow the dataset.
+    """
+
+    def __init__(
+        self,
+        dataset,
+        patch_size: int = 64,
+        stride: Optional[int] = None,
+        min_forest_fraction: float = 0.0,
+        refresh: bool = False,
+        max_workers: int = 8
+    ):
+        self.dataset = dataset
+        self.patch_size = patch_size
+        patches = load_patch_index(dataset, patch_size, stride, refresh, max_workers)
+        if min_forest_fraction > 0:
+            patches = patches[patches["forest_fraction"] >= min_forest_fraction]
+        self.patches = patches
+
+    def __len__(self) -> int:
+        return len(self.patches)
+
+    def __getitem__(self, idx: int) -> Dict[str, Any]:
+        group, row, col, forest_fraction = self.patches[idx].tolist()
+        sample = self.dataset.load_sample(group, window=(col, row, self.patch_size, self.patch_size))
+        sample["patch"] = (row, col)
+        sample["forest_fraction"] = forest_fraction
+        return sample
+
+    def sample_weights(self, bins: int = 10) -> np.ndarray:
+        """Per-patch weights inversely proportional to the frequency of their forest fraction bin.
+
+        Use with ``torch.utils.data.WeightedRandomSampler`` to draw patches
+        balanced over forest fractions.
+        """
+        which = np.minimum((self.patches["forest_fraction"] * bins).astype(np.int64), bins - 1)
+        counts = np.bincount(which, minlength=bins)
+        return 1.0 / counts[which]
@@ -0,0 +1,117 @@
+import os
+import logging
+import numpy as np
+import torch
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image
+from tqdm import tqdm
+from typing import Optional, Sequence, List, Tuple
+from .utils import SEASONS
+
+logger = logging.getLogger("SSL4EOEUForestTG")
+
+# True color composite of Sentinel-2
+RGB_BANDS = ("B04", "B03", "B02")
+
+
+def _season_rank(season: str) -> int:
+    return SEASONS.index(season) if season in SEASONS else len(SEASONS)
+
+
+def percentile_bounds(
+    image: torch.Tensor,
+    lower: float = 2,
+    upper: float = 98,
+    max_samples: int = 1 << 16
+) -> Tuple[torch.Tensor, torch.Tensor]:
+    """Per-channel lower and upper percentiles of [..., H, W] images, shaped [..., 1, 1].
+
+    Percentiles are nearest-rank estimates from an evenly strided subset of
+    at most max_samples pixels per channel, computed for all leading
+    dimensions at once. Unlike torch.quantile there is no size limit.
+    """
+    flat = image.flatten(start_dim=-2)
+    stride = max(1, -(-flat.shape[-1] // max_samples))
+    samples = flat[..., ::stride].float().sort(dim=-1).values
+    n = samples.shape[-1]
+    low = samples[..., round(lower / 100 * (n - 1))]
+    high = samples[..., round(upper / 100 * (n - 1))]
+    return low[..., None, None], high[..., None, None]
+
+
+def normalize_rgb(
+    image: torch.Tensor,
+    lower: float = 2,
+    upper: float = 98,
+    max_samples: int = 1 << 16
+) -> torch.Tensor:
+    """Percentile-stretch [..., 3, H, W] images (e.g. [S, 3, H, W] or [B, S, 3, H, W]) to float32 in [0, 1]."""
+    low, high = percentile_bounds(image, lower, upper, max_samples)
+    return ((image.float() - low) / (high - low + 1e-5)).clamp_(0, 1)
+
+
+def to_uint8(rgb: torch.Tensor) -> np.ndarray:
+    """[..., 3, H, W] floats in [0, 1] as [..., H, W, 3] uint8 array."""
+    return (rgb * 255).round_().to(torch.uint8).movedim(-3, -1).numpy()
+
+
+def quicklook_image(
+    image: torch.Tensor,
+    mask: Optional[torch.Tensor] = None,
+    thumbnail_size: Optional[int] = 256,
+    **kwargs
+) -> Image.Image:
+    """Seasons of a [S, 3, H, W] RGB stack side by side, followed by the mask if given, as one PIL image."""
+    panels = list(to_uint8(normalize_rgb(image, **kwargs)))
+    if mask is not None:
+        mask = mask.reshape(mask.shape[-2:]).numpy()
+        panels.append(np.repeat((mask > 0).astype(np.uint8)[..., None] * 255, 3, axis=-1))
+    height = max(panel.shape[0] for panel in panels)
+    panels = [np.pad(panel, ((0, height - panel.shape[0]), (0, 0), (0, 0))) for panel in panels]
+    quicklook = Image.fromarray(np.concatenate(panels, axis=1))
+    if thumbnail_size is not None:
+        quicklook.thumbnail((thumbnail_size * len(panels), thumbnail_size), Image.Resampling.BILINEAR)
+    return quicklook
+
+
+def write_quicklooks(
+    dataset,
+    path: str,
+    indices: Optional[Sequence[int]] = None,
+    thumbnail_size: Optional[int] = 256,
+    rgb_bands: Sequence[str] = RGB_BANDS,
+    overwrite: bool = False,
+    max_workers: int = 8,
+    progress: bool = True
+) -> List[str]:
+    """Write ``<group_id>.png`` quicklooks of samples (default: all) of an SSL4EOEUForestTG into path.
+
+    Each quicklook shows the seasons in SEASONS order followed by the
+    mask. Only the RGB bands of full groups are read, samples are
+    processed in a thread pool, existing files are kept unless overwrite.
+    Returns the written paths.
+    """
+    indices = range(len(dataset)) if indices is None else indices
+    band_indexes = dataset._band_indexes(rgb_bands)
+    os.makedirs(path, exist_ok=True)
+
+    def write(idx):
+        out_path = os.path.join(path, f"{dataset.df['group_id'].iat[idx]}.png")
+        if os.path.exists(out_path) and not overwrite:
+            return None
+        sample = dataset._load_group(idx, band_indexes)
+        seasons = [meta["season"] for meta in sample["metadata"]]
+        order = sorted(range(len(seasons)), key=lambda i: _season_rank(seasons[i]))
+        quicklook = quicklook_image(sample["image"][order], sample["mask"], thumbnail_size)
+        tmp_path = f"{out_path}.{os.getpid()}.tmp"
+        quicklook.save(tmp_path, format="PNG")
+        os.replace(tmp_path, out_path)
+        return out_path
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        written = [
+            p for p in tqdm(executor.map(write, indices), total=len(indices), desc="Writing quicklooks", disable=not progress)
+            if p is not None
+        ]
+    logger.info(f"Wrote {len(written)} quicklooks into {path}")
+    return written
@@ -0,0 +1,131 @@
+import os
+import math
+import hashlib
+import logging
+import itertools
+import numpy as np
+import torch
+import torch.distributed as dist
+from torch.utils.data import Sampler, get_worker_info
+from typing import Optional, Sequence, Iterable, Iterator, Tuple, TypeVar, Union
+
+logger = logging.getLogger("SSL4EOEUForestTG")
+
+T = TypeVar("T")
+
+
+def topology() -> Tuple[int, int, int, int]:
+    """(num_nodes, node, local_world_size, local_rank) of this process.
+
+    Taken from torch.distributed if initialized, otherwise from the
+    WORLD_SIZE, RANK and LOCAL_WORLD_SIZE variables torchrun sets, with a
+    single process as fallback.
+    """
+    world_size = int(os.environ.get("WORLD_SIZE", 1))
+    rank = int(os.environ.get("RANK", 0))
+    if dist.is_available() and dist.is_initialized():
+        world_size, rank = dist.get_world_size(), dist.get_rank()
+    local_world_size = int(os.environ.get("LOCAL_WORLD_SIZE", world_size))
+    return world_size // local_world_size, rank // local_world_size, local_world_size, rank % local_world_size
+
+
+def group_shards(group_ids: Sequence[str], num_shards: int) -> np.ndarray:
+    """Shard in [0, num_shards) of each group, from a stable hash of its group_id.
+
+    The assignment depends only on the group_id, so it is the same in every
+    process and run and does not move existing groups when groups are
+    added or removed.
+    """
+    hashes = np.fromiter(
+        (int.from_bytes(hashlib.sha1(str(group_id).encode()).digest()[:8], "little") for group_id in group_ids),
+        dtype=np.uint64, count=len(group_ids)
+    )
+    return (hashes % np.uint64(num_shards)).astype(np.int64)
+
+
+def worker_shard(items: Union[Sequence[T], Iterable[T]]) -> Union[Sequence[T], Iterator[T]]:
+    """The part of a sequence or stream of the current DataLoader worker (all of it outside workers)."""
+    info = get_worker_info()
+    if info is None:
+        return items
+    if isinstance(items, Sequence):
+        return items[info.id::info.num_workers]
+    return itertools.islice(items, info.id, None, info.num_workers)
+
+
+class ShardedSampler(Sampler):
+    """Distributed sampler that keeps every group on one node.
+
+    Groups are assigned to nodes by :func:`group_shards`, so a node only
+    ever reads its ~1/num_nodes of the groups and its node-local tile cache
+    stays warm across epochs. Within a node the shard is reshuffled per
+    epoch (cf. ``set_epoch``) and split among the local ranks, which fetch
+    from the shared cache. All ranks yield the same number of indices,
+    smaller node shards are padded by repeating samples, as DDP expects.
+
+    The topology defaults to :func:`topology`, pass num_nodes, node,
+    local_world_size and local_rank to simulate one. Indices are the
+    integer indices of the dataset, DataLoader workers split the batches
+    as usual.
+    """
+
+    def __init__(
+        self,
+        dataset,
+        num_nodes: Optional[int] = None,
+        node: Optional[int] = None,
+        local_world_size: Optional[int] = None,
+        local_rank: Optional[int] = None,
+        shuffle: bool = True,
+        seed: int = 0
+    ):
+        default = topology()
+        self.num_nodes = default[0] if num_nodes is None else num_nodes
+        self.node = default[1] if node is None else node
+        self.local_world_size = default[2] if local_world_size is None else local_world_size
+        self.local_rank = default[3] if local_rank is None else local_rank
+        if not (0 <= self.node < self.num_nodes and 0 <= self.local_rank < self.local_world_size):
+            raise ValueError(
+                f"Invalid topology: node {self.node} of {self.num_nodes}, "
+                f"local rank {self.local_rank} of {self.local_world_size}"
+            )
+        self.shuffle = shuffle
+        self.seed = seed
+        self.epoch = 0
+
+        shards = group_shards(dataset.df["group_id"].tolist(), self.num_nodes)
+        self.node_indices = np.flatnonzero(shards == self.node)
+        largest = np.bincount(shards, minlength=self.num_nodes).max() if len(shards) else 0
+        self.num_samples = math.ceil(largest / self.local_world_size)
+        logger.info(
+            "Node %d of %d holds %d of %d groups, %d samples per rank",
+            self.node, self.num_nodes, len(self.node_indices), len(shards), self.num_samples
+        )
+
+    def set_epoch(self, epoch: int) -> None:
+        self.epoch = epoch
+
+    def __len__(self) -> int:
+        return self.num_samples
+
+    def __iter__(self) -> Iterator[int]:
+        indices = self.node_indices
+        if self.shuffle:
+            # same permutation on all ranks of the node
+            generator = torch.Generator().manual_seed(self.seed + self.epoch)
+            indices = indices[torch.randperm(len(indices), generator=generator).numpy()]
+        total = self.num_samples * self.local_world_size
+        if 0 < len(indices) < total:
+            indices = np.resize(indices, total)
+        return iter(indices[self.local_rank:total:self.local_world_size].tolist())
+
+    def prefetch_indices(self) -> np.ndarray:
+        """This rank's share of the node shard, disjoint from the other local ranks and the same every epoch."""
+        return self.node_indices[self.local_rank::self.local_world_size]
+
+    def prefetch(self, dataset, max_workers: int = 8) -> int:
+        """Download this rank's share of the node shard into the cache, cf. ``SSL4EOEUForestTG.prefetch``.
+
+        Run on every rank of a node, the node's groups are fetched exactly once.
+        """
+        return dataset.prefetch(self.prefetch_indices().tolist(), max_workers=max_workers)
@@ -1,6 +1,13 @@
+import re
 import json
 import datasets
-from datasets.utils.file_utils import xopen
+import pyarrow.parquet as pq
+from datasets.utils.file_utils import xopen, xglob, xbasename
+
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
 
 class SSL4EOEUForest(datasets.GeneratorBasedBuilder):
     """
@@ -59,23 +66,63 @@ note = {This work was carried under the EvoLand project, cf. https://www.evo-lan
 
     def _split_generators(self, dl_manager):
         """
-        Define dataset splits - single "training" split for now.
+        Define dataset splits - single "training" split for now, served from one or more metadata shards.
         """
-        url = f"{dl_manager._base_path}/meta.jsonl"
+        if self.config.data_files:
+            urls = dl_manager.download(list(self.config.data_files["train"]))
+        else:
+            urls = discover_metadata_files(dl_manager._base_path)
         return [
             datasets.SplitGenerator(
                 name=datasets.Split.TRAIN,
-                gen_kwargs={"url": url},
+                gen_kwargs={"urls": urls},
             )
         ]
 
-    def _generate_examples(self, url):
+    def _generate_examples(self, urls):
         """
-        Streaming-compliant serving of metadata for SSL4EO data samples.
+        Streaming-compliant serving of metadata for SSL4EO data samples from JSONL or Parquet shards.
         """
-        with xopen(url, encoding="utf-8") as f:
-            for idx, line in enumerate(f):
-                yield idx, json.loads(line)
+        if isinstance(urls, str):
+            urls = [urls]
+        for url in urls:
+            name = xbasename(url)
+            if url.endswith(".parquet"):
+                with xopen(url, "rb") as f:
+                    for batch_idx, batch in enumerate(pq.ParquetFile(f).iter_batches()):
+                        for idx, row in enumerate(batch.to_pylist()):
+                            yield f"{name}:{batch_idx}:{idx}", row
+            else:
+                with xopen(url, "rb") as f:
+                    for idx, line in enumerate(f):
+                        if line.strip():
+                            yield f"{name}:{idx}", json_loads(line)
+
+
+def _hub_glob_base(base_path):
+    """
+    Map https://huggingface.co/datasets/<repo>/resolve/<revision> onto an hf:// path that supports globbing.
+    """
+    match = re.match(r"https://huggingface\.co/datasets/(.+)/resolve/([^/]+)/?$", base_path)
+    if match:
+        repo_id, revision = match.groups()
+        return f"hf://datasets/{repo_id}@{revision}"
+    return base_path
+
+
+def discover_metadata_files(base_path):
+    """
+    Metadata shards next to the loading script: meta-*-of-*.parquet, meta-*-of-*.jsonl, meta.parquet or meta.jsonl.
+    """
+    glob_base = _hub_glob_base(base_path)
+    for pattern in ("meta-*-of-*.parquet", "meta-*-of-*.jsonl", "meta.parquet"):
+        try:
+            urls = sorted(xglob(f"{glob_base}/{pattern}"))
+        except Exception:
+            urls = []
+        if urls:
+            return urls
+    return [f"{base_path}/meta.jsonl"]
 
 
 from datasets import Features, Value, Sequence
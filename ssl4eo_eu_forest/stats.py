@@ -0,0 +1,267 @@
+import os
+import json
+import logging
+import numpy as np
+import rasterio
+import torch
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from tqdm import tqdm
+from typing import Optional, Sequence, Dict, List, Union, Any
+from .utils import SEASONS, BANDS, get_season
+
+logger = logging.getLogger("SSL4EOEUForestTG")
+
+BAND_STATS_VERSION = 1
+
+# Percentiles written into the band_stats.json summary
+PERCENTILES = (1, 2, 5, 25, 50, 75, 95, 98, 99)
+
+# Key of the statistics over all seasons
+ALL_SEASONS = "all"
+
+
+class BandStats:
+    """Mergeable per-band statistics of uint16 images.
+
+    Keeps the pixel count, mean and sum of squared deviations (Welford /
+    Chan et al. moments) plus an exact histogram with one bin per uint16
+    value, grown up to the largest value seen. Accumulators of disjoint
+    sets of images merge into the statistics of their union, so they can
+    be computed in parallel. Pixels equal to nodata are ignored.
+    """
+
+    def __init__(self, n_bands: int = len(BANDS), nodata: Optional[int] = 0):
+        self.nodata = nodata
+        self.count = np.zeros(n_bands, dtype=np.int64)
+        self.mean = np.zeros(n_bands, dtype=np.float64)
+        self.m2 = np.zeros(n_bands, dtype=np.float64)
+        self.histogram = np.zeros((n_bands, 0), dtype=np.int64)
+
+    @property
+    def n_bands(self) -> int:
+        return len(self.count)
+
+    def update(self, image: np.ndarray) -> "BandStats":
+        """Add the pixels of a [C, H, W] (or [C, N]) uint16 image."""
+        bands = image.reshape(self.n_bands, -1)
+        size = int(bands.max()) + 1 if bands.size else 0
+        histogram = np.zeros((self.n_bands, size), dtype=np.int64)
+        for i, band in enumerate(bands):
+            histogram[i] = np.bincount(band, minlength=size)
+        if self.nodata is not None and self.nodata < size:
+            histogram[:, self.nodata] = 0
+        return self.merge(self.from_histogram(histogram, self.nodata))
+
+    @classmethod
+    def from_histogram(cls, histogram: np.ndarray, nodata: Optional[int] = 0) -> "BandStats":
+        """Statistics of the pixels counted by a [C, N] histogram."""
+        stats = cls(len(histogram), nodata)
+        values = np.arange(histogram.shape[1], dtype=np.float64)
+        stats.count = histogram.sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            stats.mean = np.nan_to_num(histogram @ values / stats.count)
+        stats.m2 = (histogram * (values - stats.mean[:, None]) ** 2).sum(axis=1)
+        stats.histogram = histogram
+        return stats
+
+    def merge(self, other: "BandStats") -> "BandStats":
+        """Add the statistics of other, in place."""
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        with np.errstate(invalid="ignore", divide="ignore"):
+            self.mean = np.nan_to_num(self.mean + delta * other.count / count)
+            self.m2 = self.m2 + other.m2 + np.nan_to_num(delta ** 2 * self.count * other.count / count)
+        self.count = count
+
+        size = max(self.histogram.shape[1], other.histogram.shape[1])
+        histogram = np.zeros((self.n_bands, size), dtype=np.int64)
+        histogram[:, :self.histogram.shape[1]] += self.histogram
+        histogram[:, :other.histogram.shape[1]] += other.histogram
+        self.histogram = histogram
+        return self
+
+    @property
+    def std(self) -> np.ndarray:
+        """Population standard deviation per band."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.nan_to_num(np.sqrt(self.m2 / self.count))
+
+    def percentiles(self, q: Sequence[float] = PERCENTILES) -> np.ndarray:
+        """Nearest-rank percentiles from the histograms, shaped [len(q), C]."""
+        cumulative = self.histogram.cumsum(axis=1)
+        result = np.zeros((len(q), self.n_bands), dtype=np.int64)
+        for i, p in enumerate(q):
+            rank = np.maximum(np.ceil(p / 100 * self.count), 1)
+            result[i] = (cumulative >= rank[:, None]).argmax(axis=1)
+        return result
+
+    def summary(self, percentiles: Sequence[float] = PERCENTILES) -> Dict[str, Any]:
+        """count, mean, std and percentiles per band as JSON-serializable lists."""
+        return {
+            "count": self.count.tolist(),
+            "mean": self.mean.tolist(),
+            "std": self.std.tolist(),
+            "percentiles": {f"{p:g}": values.tolist() for p, values in zip(percentiles, self.percentiles(percentiles))}
+        }
+
+
+def group_band_stats(group_dir: Path, nodata: Optional[int] = 0) -> Dict[str, BandStats]:
+    """Per-season statistics of the all_bands.tif images of one group directory."""
+    stats = {}
+    for image_dir in sorted(p for p in group_dir.iterdir() if p.is_dir()):
+        tif_path = image_dir / "all_bands.tif"
+        if not tif_path.exists():
+            continue
+        try:
+            season = get_season(image_dir.name.split("_")[0])
+            with rasterio.open(tif_path) as src:
+                image = src.read()
+        except Exception:
+            logger.warning("Skipping unreadable image %s", tif_path)
+            continue
+        stats.setdefault(season, BandStats(len(image), nodata)).update(image)
+    return stats
+
+
+def band_stats_chunk(group_dirs: Sequence[Path], nodata: Optional[int] = 0) -> Dict[str, BandStats]:
+    """Merged per-season statistics of a chunk of groups, computed in one worker task."""
+    stats = {}
+    for group_dir in group_dirs:
+        for season, group_stats in group_band_stats(group_dir, nodata).items():
+            if season in stats:
+                stats[season].merge(group_stats)
+            else:
+                stats[season] = group_stats
+    return stats
+
+
+def save_band_stats(stats: Dict[str, BandStats], path: str, percentiles: Sequence[float] = PERCENTILES) -> None:
+    """Write a band_stats.json summary and the mergeable accumulators next to it (.npz)."""
+    path = Path(path)
+    summary = {
+        "version": BAND_STATS_VERSION,
+        "bands": list(BANDS),
+        "seasons": {season: season_stats.summary(percentiles) for season, season_stats in stats.items()}
+    }
+    arrays = {}
+    for season, season_stats in stats.items():
+        for name in ("count", "mean", "m2", "histogram"):
+            arrays[f"{season}.{name}"] = getattr(season_stats, name)
+
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with tmp_path.open("w") as f:
+        json.dump(summary, f, indent=1)
+    tmp_npz = path.with_name(f".{path.stem}.tmp.npz")
+    np.savez_compressed(tmp_npz, **arrays)
+    tmp_npz.replace(path.with_suffix(".npz"))
+    tmp_path.replace(path)
+
+
+def load_band_stats(path: str, nodata: Optional[int] = 0) -> Dict[str, BandStats]:
+    """Accumulators written by save_band_stats, from the .npz next to path."""
+    stats = {}
+    with np.load(Path(path).with_suffix(".npz")) as arrays:
+        for key in arrays.files:
+            season, name = key.rsplit(".", 1)
+            season_stats = stats.setdefault(season, BandStats(len(arrays[f"{season}.count"]), nodata))
+            setattr(season_stats, name, arrays[key])
+    return stats
+
+
+def band_stats_from_ssl4eo_eu_forest_dir(
+    path: str,
+    output: str = "band_stats.json",
+    chunksize: int = 16,
+    max_workers: Optional[int] = None,
+    nodata: Optional[int] = 0,
+    percentiles: Sequence[float] = PERCENTILES
+) -> Dict[str, BandStats]:
+    """Per-band statistics of all images of the local or cached tree at path, per season and overall.
+
+    Groups are processed in chunks of chunksize per worker task like
+    metadata_jsonl_from_ssl4eo_eu_forest_dir, only the merged accumulators
+    of a chunk travel back. Means and standard deviations, percentiles and
+    the accumulators are written into output (relative to path, next to
+    meta.jsonl) and its .npz sidecar. Returns {season: BandStats} with the
+    statistics over all seasons under "all".
+    """
+    base_dir = Path(path)
+    output_path = Path(output) if Path(output).is_absolute() else base_dir / output
+    group_dirs = sorted((p for p in (base_dir / "images").iterdir() if p.is_dir()), key=lambda p: p.name)
+    chunks = [group_dirs[i:i + chunksize] for i in range(0, len(group_dirs), chunksize)]
+
+    stats = {}
+    with ProcessPoolExecutor(max_workers=max_workers) as executor, \
+            tqdm(total=len(group_dirs), desc="Computing band statistics") as progress:
+        for chunk, chunk_stats in zip(chunks, executor.map(partial(band_stats_chunk, nodata=nodata), chunks)):
+            for season, season_stats in chunk_stats.items():
+                if season in stats:
+                    stats[season].merge(season_stats)
+                else:
+                    stats[season] = season_stats
+            progress.update(len(chunk))
+
+    stats = {season: stats[season] for season in sorted(stats, key=lambda s: SEASONS.index(s))}
+    if stats:
+        overall = BandStats(next(iter(stats.values())).n_bands, nodata)
+        for season_stats in stats.values():
+            overall.merge(season_stats)
+        stats[ALL_SEASONS] = overall
+
+    save_band_stats(stats, str(output_path), percentiles)
+    logger.info("Wrote band statistics of %d groups into %s", len(group_dirs), output_path)
+    return stats
+
+
+class Normalize:
+    """Sample transform standardizing images with precomputed band statistics.
+
+    stats is the path of a band_stats.json (cf.
+    :func:`band_stats_from_ssl4eo_eu_forest_dir`) or its parsed content,
+    bands the band subset of the dataset (default: all). Each season of
+    the [S, C, H, W] image is standardized with the mean and std of its
+    season, or of all seasons if per_season is False. With percentiles
+    (lower, upper), e.g. (2, 98), bands are instead stretched between
+    those stored percentiles and clipped to [0, 1]. The image becomes
+    float32, other keys of the sample are kept.
+    """
+
+    def __init__(
+        self,
+        stats: Union[str, os.PathLike, Dict[str, Any]],
+        bands: Optional[Sequence[str]] = None,
+        per_season: bool = True,
+        percentiles: Optional[Sequence[float]] = None
+    ):
+        if not isinstance(stats, dict):
+            with open(stats) as f:
+                stats = json.load(f)
+        band_positions = [stats["bands"].index(band) for band in (bands or stats["bands"])]
+        self.per_season = per_season
+        self.percentiles = percentiles
+
+        self._offset, self._scale = {}, {}
+        for season, season_stats in stats["seasons"].items():
+            if percentiles is None:
+                offset, scale = season_stats["mean"], season_stats["std"]
+            else:
+                lower, upper = (season_stats["percentiles"][f"{p:g}"] for p in percentiles)
+                offset, scale = lower, [high - low for low, high in zip(lower, upper)]
+            offset = torch.tensor([offset[i] for i in band_positions], dtype=torch.float32)
+            scale = torch.tensor([scale[i] for i in band_positions], dtype=torch.float32)
+            self._offset[season] = offset[:, None, None]
+            self._scale[season] = scale.clamp(min=1e-6)[:, None, None]
+
+    def _season_tensors(self, seasons: List[str]):
+        keys = [season if self.per_season else ALL_SEASONS for season in seasons]
+        return torch.stack([self._offset[k] for k in keys]), torch.stack([self._scale[k] for k in keys])
+
+    def __call__(self, sample: Dict[str, Any]) -> Dict[str, Any]:
+        image = sample["image"]
+        offset, scale = self._season_tensors([meta["season"] for meta in sample["metadata"]])
+        normalized = (image.float() - offset) / scale
+        if self.percentiles is not None:
+            normalized = normalized.clamp_(0, 1)
+        return {**sample, "image": normalized}
@@ -0,0 +1,202 @@
+import os
+import json
+import logging
+import numpy as np
+import torch
+from affine import Affine
+from concurrent.futures import ThreadPoolExecutor
+from torch.utils.data import Dataset
+from tqdm import tqdm
+from typing import Optional, Callable, Sequence, Tuple, Dict, Any
+from .utils import SEASONS
+
+logger = logging.getLogger("SSL4EOEUForestTG")
+
+STORE_VERSION = 1
+
+
+def _shard_name(kind: str, shard: int) -> str:
+    return f"{kind}-{shard:05d}.npy"
+
+
+def export_store(
+    dataset,
+    path: str,
+    indices: Optional[Sequence[int]] = None,
+    size: Optional[Tuple[int, int]] = None,
+    shard_size: int = 4096,
+    max_workers: int = 8
+) -> str:
+    """Convert samples of an SSL4EOEUForestTG into a consolidated store of memory-mappable .npy shards.
+
+    Each shard holds ``images`` [n, S, C, H, W] uint16 with one slot per
+    season of :data:`~ssl4eo_eu_forest.utils.SEASONS`, ``masks`` [n, 1, H, W]
+    uint8 and ``valid`` [n, S] flagging which season slots hold an image.
+    Groups smaller than size are zero-padded, larger ones cropped, the
+    first acquisition of a season wins. Bands and window follow the
+    dataset. Per-image metadata goes to ``metadata.npz``.
+    """
+    indices = list(range(len(dataset))) if indices is None else list(indices)
+    if size is None:
+        if dataset.window is not None:
+            size = (int(dataset.window.height), int(dataset.window.width))
+        else:
+            rows = dataset.df.iloc[indices]
+            size = (int(rows["mask_height"].max()), int(rows["mask_width"].max()))
+    height, width = size
+    n, n_seasons, n_bands = len(indices), len(SEASONS), len(dataset.bands)
+    os.makedirs(path, exist_ok=True)
+
+    group_ids = np.empty(n, dtype=object)
+    crs = np.full(n, "", dtype=object)
+    timestamp_start = np.full((n, n_seasons), "", dtype=object)
+    timestamp_end = np.full((n, n_seasons), "", dtype=object)
+    tile_id = np.full((n, n_seasons), "", dtype=object)
+    transform = np.zeros((n, n_seasons, 6), dtype=np.float64)
+
+    shards = []
+    for shard, start in enumerate(range(0, n, shard_size)):
+        stop = min(start + shard_size, n)
+        images = np.lib.format.open_memmap(
+            os.path.join(path, _shard_name("images", shard)), mode="w+",
+            dtype=np.uint16, shape=(stop - start, n_seasons, n_bands, height, width)
+        )
+        masks = np.lib.format.open_memmap(
+            os.path.join(path, _shard_name("masks", shard)), mode="w+",
+            dtype=np.uint8, shape=(stop - start, 1, height, width)
+        )
+        valid = np.zeros((stop - start, n_seasons), dtype=bool)
+
+        def write(i):
+            sample = dataset._load_group(indices[i], dataset.band_indexes, dataset.window)
+            row = i - start
+            group_ids[i] = sample["group_id"]
+            mask = sample["mask"].numpy()[:, :height, :width]
+            masks[row, :, :mask.shape[1], :mask.shape[2]] = mask
+            for image, meta in zip(sample["image"].numpy(), sample["metadata"]):
+                slot = SEASONS.index(meta["season"])
+                if valid[row, slot]:
+                    continue
+                valid[row, slot] = True
+                image = image[:, :height, :width]
+                images[row, slot, :, :image.shape[1], :image.shape[2]] = image
+                timestamp_start[i, slot] = meta["timestamp_start"]
+                timestamp_end[i, slot] = meta["timestamp_end"]
+                tile_id[i, slot] = meta["tile_id"]
+                transform[i, slot] = tuple(meta["transform"])[:6]
+                crs[i] = meta["crs"] or ""
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            list(tqdm(executor.map(write, range(start, stop)), total=stop - start, desc=f"Exporting shard {shard}"))
+
+        images.flush()
+        masks.flush()
+        np.save(os.path.join(path, _shard_name("valid", shard)), valid)
+        shards.append(stop - start)
+
+    np.savez(
+        os.path.join(path, "metadata.npz"),
+        group_id=group_ids.astype(str),
+        crs=crs.astype(str),
+        timestamp_start=timestamp_start.astype(str),
+        timestamp_end=timestamp_end.astype(str),
+        tile_id=tile_id.astype(str),
+        transform=transform
+    )
+    with open(os.path.join(path, "store.json"), "w") as f:
+        json.dump({
+            "version": STORE_VERSION,
+            "seasons": list(SEASONS),
+            "bands": list(dataset.bands),
+            "size": [height, width],
+            "shards": shards
+        }, f, indent=2)
+
+    logger.info(f"Exported {n} samples into {len(shards)} shards at {path}")
+    return path
+
+
+class SSL4EOEUForestStore(Dataset):
+    """Samples of a store written by :func:`export_store`, served as zero-copy views of memory-mapped shards.
+
+    Samples carry the keys of :class:`SSL4EOEUForestTG` samples. image
+    always has one slot per season in SEASONS order, the extra key
+    ``season_mask`` flags the slots that hold an acquisition.
+    """
+
+    def __init__(self, path: str, transforms: Optional[Callable] = None):
+        self.path = path
+        self.transforms = transforms
+
+        with open(os.path.join(path, "store.json")) as f:
+            self.info = json.load(f)
+        if self.info["version"] != STORE_VERSION:
+            raise ValueError(f"Unsupported store version {self.info['version']} at {path}")
+        self.seasons = self.info["seasons"]
+        self.bands = self.info["bands"]
+
+        with np.load(os.path.join(path, "metadata.npz")) as meta:
+            self.meta = {key: meta[key] for key in meta.files}
+        self.valid = np.concatenate([
+            np.load(os.path.join(path, _shard_name("valid", shard)))
+            for shard in range(len(self.info["shards"]))
+        ])
+        self.offsets = np.cumsum([0] + self.info["shards"])
+        self._shards = None
+
+    def _open(self):
+        # copy-on-write maps are writable, so torch.from_numpy neither copies nor warns
+        self._shards = [
+            (
+                np.load(os.path.join(self.path, _shard_name("images", shard)), mmap_mode="c"),
+                np.load(os.path.join(self.path, _shard_name("masks", shard)), mmap_mode="c")
+            )
+            for shard in range(len(self.info["shards"]))
+        ]
+
+    def __getstate__(self):
+        # never pickle the memory maps into spawned DataLoader workers
+        state = self.__dict__.copy()
+        state["_shards"] = None
+        return state
+
+    def __len__(self) -> int:
+        return int(self.offsets[-1])
+
+    def __getitem__(self, idx: int) -> Dict[str, Any]:
+        if self._shards is None:
+            self._open()
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError(f"index {idx} out of range for store with {len(self)} samples")
+        shard = int(np.searchsorted(self.offsets, idx, side="right")) - 1
+        row = idx - self.offsets[shard]
+        images, masks = self._shards[shard]
+        height, width = self.info["size"]
+
+        metadata = []
+        for slot, season in enumerate(self.seasons):
+            valid = bool(self.valid[idx, slot])
+            metadata.append({
+                "season": season,
+                "timestamp_start": str(self.meta["timestamp_start"][idx, slot]) if valid else None,
+                "timestamp_end": str(self.meta["timestamp_end"][idx, slot]) if valid else None,
+                "tile_id": str(self.meta["tile_id"][idx, slot]) if valid else None,
+                "shape": torch.Size([len(self.bands), height, width]),
+                "crs": str(self.meta["crs"][idx]) or None,
+                "transform": Affine(*self.meta["transform"][idx, slot]) if valid else None
+            })
+
+        sample = {
+            "image": torch.from_numpy(images[row]),
+            "mask": torch.from_numpy(masks[row]),
+            "season_mask": torch.from_numpy(self.valid[idx].copy()),
+            "group_id": str(self.meta["group_id"][idx]),
+            "metadata": metadata
+        }
+
+        if self.transforms:
+            sample = self.transforms(sample)
+
+        return sample
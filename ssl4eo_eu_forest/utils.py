@@ -1,10 +1,36 @@
 from pathlib import Path
 from datetime import datetime
+import logging
+import numpy as np
 import rasterio
-from rasterio.warp import transform_bounds
-from concurrent.futures import ProcessPoolExecutor, as_completed
+from rasterio.warp import transform, transform_bounds
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from tqdm import tqdm
 import json
+import hashlib
+
+logger = logging.getLogger("SSL4EOEUForestTG")
+
+# GDAL configuration for header reads: no sibling file listing, no .aux.xml / .ovr / world file lookups
+HEADER_ENV = {
+    "GDAL_DISABLE_READDIR_ON_OPEN": "EMPTY_DIR",
+    "GDAL_PAM_ENABLED": "NO",
+    "GDAL_GEOREF_SOURCES": "INTERNAL",
+}
+
+# Seasons in the order images are stacked
+SEASONS = ("winter", "spring", "summer", "fall")
+
+# Sentinel-2 L2A bands in the order they are stored in all_bands.tif
+BANDS = ("B01", "B02", "B03", "B04", "B05", "B06", "B07", "B08", "B8A", "B09", "B11", "B12")
+
+# 1-based rasterio band indexes of Sentinel-2 band names
+def band_indexes(bands):
+    unknown = [band for band in bands if band not in BANDS]
+    if unknown:
+        raise ValueError(f"Unknown bands {unknown}, expected a subset of {BANDS}")
+    return [BANDS.index(band) + 1 for band in bands]
 
 # Season detection
 def get_season(date_str):
@@ -32,31 +58,73 @@ def get_dimensions(tif_path):
     with rasterio.open(tif_path) as src:
         return src.width, src.height
 
-# Process one group
-def process_group(group_dir, base_dir):
+# Fingerprint of a group from mtime and size of its rasters, no raster is opened
+def group_fingerprint(group_dir, base_dir):
+    group_id = group_dir.name
+    paths = [base_dir / "masks" / group_id / "mask.tif"]
+    image_dir = base_dir / "images" / group_id
+    if image_dir.is_dir():
+        paths += sorted(subdir / "all_bands.tif" for subdir in image_dir.iterdir())
+    parts = []
+    for path in paths:
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        parts.append(f"{path.relative_to(base_dir).as_posix()}:{stat.st_mtime_ns}:{stat.st_size}")
+    return hashlib.sha1("\n".join(parts).encode()).hexdigest()
+
+# CRS, native bounds and size from one open of the raster header, no pixels are read
+def read_header(tif_path):
+    with rasterio.open(tif_path) as src:
+        return src.crs, tuple(src.bounds), src.width, src.height
+
+# Bounds of many rasters in one CRS to EPSG:4326 with one batched transform, densified like transform_bounds
+def bounds_to_epsg4326(crs, bounds, densify_pts=21):
+    bounds = np.asarray(bounds, dtype=np.float64).reshape(-1, 4)
+    if crs.to_epsg() == 4326:
+        return bounds
+    t = np.linspace(0, 1, densify_pts + 2)
+    left, bottom, right, top = (bounds[:, i:i + 1] for i in range(4))
+    xs = np.concatenate([left + (right - left) * t, np.repeat(right, len(t), 1),
+                         right - (right - left) * t, np.repeat(left, len(t), 1)], axis=1)
+    ys = np.concatenate([np.repeat(bottom, len(t), 1), bottom + (top - bottom) * t,
+                         np.repeat(top, len(t), 1), top - (top - bottom) * t], axis=1)
+    lon, lat = transform(crs, "EPSG:4326", xs.ravel(), ys.ravel())
+    lon = np.asarray(lon).reshape(xs.shape)
+    lat = np.asarray(lat).reshape(ys.shape)
+    return np.stack([lon.min(1), lat.min(1), lon.max(1), lat.max(1)], axis=1)
+
+# Row of one group with the mask bounds still in their native CRS, failures are appended to errors
+def read_group(group_dir, base_dir, errors):
     group_id = group_dir.name
     mask_path = base_dir / "masks" / group_id / "mask.tif"
     if not mask_path.exists():
+        errors.append({"group_id": group_id, "path": str(mask_path.relative_to(base_dir).as_posix()),
+                       "error": "missing mask"})
         return None
 
     try:
-        bbox = get_bbox_epsg4326(mask_path)
-        mask_width, mask_height = get_dimensions(mask_path)
+        crs, bounds, mask_width, mask_height = read_header(mask_path)
+        if crs is None:
+            raise ValueError("mask has no CRS")
     except Exception as e:
+        errors.append({"group_id": group_id, "path": str(mask_path.relative_to(base_dir).as_posix()),
+                       "error": f"{type(e).__name__}: {e}"})
         return None
 
     entries = []
     consistent = True
     image_dir = base_dir / "images" / group_id
 
-    for subdir in image_dir.iterdir():
+    for subdir in sorted(image_dir.iterdir()):
         tif_path = subdir / "all_bands.tif"
         if not tif_path.exists():
             continue
         try:
             timestamp_start, timestamp_end, tile_id = subdir.name.split("_")
             season = get_season(timestamp_start)
-            img_width, img_height = get_dimensions(tif_path)
+            _, _, img_width, img_height = read_header(tif_path)
             if (img_width != mask_width) or (img_height != mask_height):
                 consistent = False
             entries.append({
@@ -68,34 +136,163 @@ def process_group(group_dir, base_dir):
                 "width": img_width,
                 "height": img_height
             })
-        except Exception:
-            continue
-    
-    return {
+        except Exception as e:
+            errors.append({"group_id": group_id, "path": str(tif_path.relative_to(base_dir).as_posix()),
+                           "error": f"{type(e).__name__}: {e}"})
+
+    row = {
         "group_id": group_id,
         "mask_path": str(mask_path.relative_to(base_dir).as_posix()),
-        "bbox_epsg4326": bbox,
+        "bbox_epsg4326": None,
         "mask_width": mask_width,
         "mask_height": mask_height,
         "images": entries,
         "dimensions_match": consistent
     }
+    return row, crs, bounds
 
+# Fill in bbox_epsg4326 of read_group results with one transform per distinct CRS
+def add_bboxes(groups):
+    by_crs = {}
+    for row, crs, bounds in groups:
+        by_crs.setdefault(crs, []).append((row, bounds))
+    for crs, items in by_crs.items():
+        bboxes = bounds_to_epsg4326(crs, [bounds for _, bounds in items])
+        for (row, _), bbox in zip(items, bboxes.tolist()):
+            row["bbox_epsg4326"] = bbox
 
-def metadata_jsonl_from_ssl4eo_eu_forest_dir(path:str, output='meta.jsonl'):
+# Process one group, None if its mask is missing or unreadable (cf. errors)
+def process_group(group_dir, base_dir, errors=None):
+    errors = [] if errors is None else errors
+    with rasterio.Env(**HEADER_ENV):
+        group = read_group(group_dir, base_dir, errors)
+    if group is None:
+        return None
+    add_bboxes([group])
+    return group[0]
+
+
+# Parquet copy of a metadata JSONL file, served by the Arrow/Parquet variant of the HF builder
+def metadata_parquet_from_jsonl(jsonl_path, parquet_path=None):
+    import pyarrow.json
+    import pyarrow.parquet
+    jsonl_path = Path(jsonl_path)
+    parquet_path = Path(parquet_path) if parquet_path else jsonl_path.with_suffix(".parquet")
+    pyarrow.parquet.write_table(pyarrow.json.read_json(jsonl_path), parquet_path)
+    return parquet_path
+
+
+# Process a chunk of groups in one worker task, preserving their order. Headers
+# are read in one GDAL environment and bboxes transformed per CRS for the chunk.
+def process_group_chunk(group_dirs, base_dir, known_fingerprints):
+    results, groups, errors = [], [], []
+    with rasterio.Env(**HEADER_ENV):
+        for group_dir in group_dirs:
+            fingerprint = group_fingerprint(group_dir, base_dir)
+            if fingerprint == known_fingerprints.get(group_dir.name):
+                results.append((group_dir.name, fingerprint, False, None))
+                continue
+            group = read_group(group_dir, base_dir, errors)
+            if group is not None:
+                groups.append(group)
+            results.append((group_dir.name, fingerprint, True, None if group is None else group[0]))
+    add_bboxes(groups)
+    return results, errors
+
+
+# Paths of the metadata files: output itself or its meta-00000-of-000NN.jsonl shards
+def metadata_shard_paths(output_path, num_shards=1):
+    output_path = Path(output_path)
+    if num_shards == 1:
+        return [output_path]
+    return [
+        output_path.with_name(f"{output_path.stem}-{i:05d}-of-{num_shards:05d}{output_path.suffix}")
+        for i in range(num_shards)
+    ]
+
+
+def metadata_jsonl_from_ssl4eo_eu_forest_dir(path:str, output='meta.jsonl', incremental=False, num_shards=1, chunksize=64):
+    """Write one metadata row per group of the tree at path into output (relative to path).
+
+    Groups are processed in chunks of chunksize per worker task and rows are
+    written in sorted group_id order as the chunks complete, so the output
+    is reproducible across runs. With num_shards > 1 the rows are split into
+    contiguous ``meta-00000-of-000NN.jsonl`` shards instead of one file.
+
+    With incremental=True, rows of groups whose rasters kept their mtime and
+    size since the last run (cf. the meta.fingerprints.json sidecar) are
+    copied from the existing output instead of reopening the rasters.
+    Groups without a row in the existing output are always read again.
+    Rows are streamed to temporary files which replace the output at the end.
+
+    Only raster headers are read, once per file and with HEADER_ENV, and
+    bboxes are transformed to EPSG:4326 in one batch per CRS and chunk.
+    Groups and images that cannot be read are listed with the reason in
+    the meta.errors.jsonl sidecar, which is also returned. Groups with
+    errors are read again by the next incremental run.
+    """
     base_dir = Path(path)
-    output_path = base_dir / "meta.jsonl"
-    group_dirs = [p for p in (base_dir / "images").iterdir() if p.is_dir()]
-    results = []
-
-    with ProcessPoolExecutor() as executor:
-        futures = {executor.submit(process_group, group_dir, base_dir): group_dir.name for group_dir in group_dirs}
-        for future in tqdm(as_completed(futures), total=len(futures), desc="Processing groups"):
-            result = future.result()
-            if result:
-                results.append(result)
-    
-    # Write to JSONL
-    with output_path.open("w") as f:
-        for item in results:
-            f.write(json.dumps(item) + "\n")
+    output_path = Path(output) if Path(output).is_absolute() else base_dir / output
+    shard_paths = metadata_shard_paths(output_path, num_shards)
+    fingerprints_path = output_path.with_suffix(".fingerprints.json")
+    group_dirs = sorted((p for p in (base_dir / "images").iterdir() if p.is_dir()), key=lambda p: p.name)
+
+    known_rows, known_fingerprints = {}, {}
+    if incremental and fingerprints_path.exists():
+        with fingerprints_path.open() as f:
+            known_fingerprints = json.load(f)
+        known_paths = [output_path] + sorted(output_path.parent.glob(f"{output_path.stem}-*-of-*{output_path.suffix}"))
+        for known_path in known_paths:
+            if not known_path.exists():
+                continue
+            with known_path.open() as f:
+                for line in f:
+                    if line.strip():
+                        known_rows[json.loads(line)["group_id"]] = line.rstrip("\n")
+
+    chunks = [group_dirs[i:i + chunksize] for i in range(0, len(group_dirs), chunksize)]
+    fingerprints, errors = {}, []
+    errors_path = output_path.with_suffix(".errors.jsonl")
+    tmp_paths = [p.with_name(f".{p.name}.tmp") for p in shard_paths]
+    outs = [p.open("w") for p in tmp_paths]
+    try:
+        with ProcessPoolExecutor() as executor, tqdm(total=len(group_dirs), desc="Processing groups") as progress:
+            position = 0
+            # each task only carries the fingerprints of its own groups, and only
+            # of groups with a stored row to copy (others are read again)
+            chunk_fingerprints = (
+                {p.name: known_fingerprints[p.name] for p in chunk if p.name in known_fingerprints and p.name in known_rows}
+                for chunk in chunks
+            )
+            for results, chunk_errors in executor.map(process_group_chunk, chunks, repeat(base_dir), chunk_fingerprints):
+                errors.extend(chunk_errors)
+                failed = {error["group_id"] for error in chunk_errors}
+                for group_id, fingerprint, changed, result in results:
+                    out = outs[position * num_shards // len(group_dirs)]
+                    position += 1
+                    if group_id not in failed:
+                        fingerprints[group_id] = fingerprint
+                    if not changed:
+                        out.write(known_rows[group_id] + "\n")
+                    elif result:
+                        out.write(json.dumps(result) + "\n")
+                progress.update(len(results))
+    finally:
+        for out in outs:
+            out.close()
+
+    for tmp_path, shard_path in zip(tmp_paths, shard_paths):
+        tmp_path.replace(shard_path)
+    # drop shards of a previous run with a different shard count
+    for stale_path in output_path.parent.glob(f"{output_path.stem}-*-of-*{output_path.suffix}"):
+        if stale_path not in shard_paths:
+            stale_path.unlink()
+    with fingerprints_path.open("w") as f:
+        json.dump(fingerprints, f)
+    with errors_path.open("w") as f:
+        for error in errors:
+            f.write(json.dumps(error) + "\n")
+    if errors:
+        failed = len({error["group_id"] for error in errors})
+        logger.warning(f"{len(errors)} files of {failed} groups could not be read, cf. {errors_path}")
+    return errors
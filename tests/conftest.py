@@ -0,0 +1,62 @@
+import os
+import re
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+
+class RangeRequestHandler(SimpleHTTPRequestHandler):
+    """Static file handler with support for single HTTP range requests."""
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_head(self):
+        path = self.translate_path(self.path)
+        match = re.fullmatch(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+        if self.command == "GET":
+            self.server.requests.append((self.path, self.headers.get("Range")))
+        if not match or not os.path.isfile(path):
+            return super().send_head()
+
+        size = os.path.getsize(path)
+        start = int(match.group(1))
+        end = int(match.group(2)) if match.group(2) else size - 1
+        if start >= size:
+            self.send_response(416)
+            self.send_header("Content-Range", f"bytes */{size}")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return None
+
+        f = open(path, "rb")
+        f.seek(start)
+        self.send_response(206)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        self.send_header("Content-Length", str(end - start + 1))
+        self.end_headers()
+        self.range_end = end - start + 1
+        return f
+
+    def copyfile(self, source, outputfile):
+        length = getattr(self, "range_end", None)
+        if length is None:
+            return super().copyfile(source, outputfile)
+        outputfile.write(source.read(length))
+
+
+@pytest.fixture
+def http_server(tmp_path):
+    """Local HTTP stand-in serving tmp_path / "remote", yields (base_url, directory, server)."""
+    directory = tmp_path / "remote"
+    directory.mkdir()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(RangeRequestHandler, directory=str(directory)))
+    server.requests = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}", directory, server
+    server.shutdown()
+    server.server_close()
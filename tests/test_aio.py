@@ -0,0 +1,58 @@
+import asyncio
+import shutil
+import threading
+
+from ssl4eo_eu_forest.aio import AsyncSampleLoader
+from tests.test_dataset import make_cached_dataset
+
+
+def make_remote_dataset(tmp_path, http_server, n_groups=3):
+    """Dataset whose files are only served by the local HTTP stand-in, with an empty cache root."""
+    base_url, remote_dir, server = http_server
+    ds = make_cached_dataset(tmp_path / "cache", n_groups=n_groups)
+    for top in ("masks", "images"):
+        shutil.move(tmp_path / "cache" / top, remote_dir / top)
+    ds.url_prefix = f"{base_url}/"
+    return ds, server
+
+
+def test_async_load_decodes_from_memory(tmp_path, http_server):
+    ds, server = make_remote_dataset(tmp_path, http_server)
+    loader = AsyncSampleLoader(ds)
+    sample = asyncio.run(loader.load(2, bands=["B02", "B03"], window=(0, 0, 32, 32)))
+
+    assert tuple(sample["image"].shape) == (2, 2, 32, 32)
+    assert tuple(sample["mask"].shape) == (1, 32, 32)
+    assert sample["image"][0].int().unique().tolist() == [102]
+    assert sample["image"][1].int().unique().tolist() == [202]
+    assert [m["season"] for m in sample["metadata"]] == ["winter", "summer"]
+    assert len(server.requests) == 3
+    # nothing is written to the disk cache
+    assert [p.name for p in (tmp_path / "cache").iterdir()] == [".metadata"]
+
+
+def test_iter_samples_prefetches_in_order(tmp_path, http_server):
+    ds, server = make_remote_dataset(tmp_path, http_server, n_groups=4)
+    loader = AsyncSampleLoader(ds, prefetch=2)
+
+    group_ids = [sample["group_id"] for sample in loader.iter_samples()]
+    assert group_ids == ["0000000", "0000001", "0000002", "0000003"]
+    assert len(server.requests) == 4 * 3
+
+    # stopping early cancels the look-ahead and shuts the event loop down
+    samples = loader.iter_samples([3, 1, 0, 2])
+    assert next(samples)["group_id"] == "0000003"
+    samples.close()
+    assert not [t for t in threading.enumerate() if t.name == "AsyncSampleLoader" or t.name.startswith("asyncio_")]
+
+
+def test_iter_samples_inside_running_loop(tmp_path, http_server):
+    ds, _ = make_remote_dataset(tmp_path, http_server)
+    loader = AsyncSampleLoader(ds)
+
+    async def notebook_cell():
+        # synchronous iteration from a coroutine, as in a Jupyter cell
+        return [sample["group_id"] for sample in loader.iter_samples([2, 0])]
+
+    assert asyncio.run(notebook_cell()) == ["0000002", "0000000"]
+    assert not [t for t in threading.enumerate() if t.name == "AsyncSampleLoader" or t.name.startswith("asyncio_")]
@@ -0,0 +1,25 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmarks.run import make_tree, regressions, peak_rss_mb
+
+
+def test_regressions_respect_metric_direction():
+    baseline = {"getitem_cold_s": 0.10, "dataloader_2_workers_samples_per_s": 100.0, "getitem_peak_rss_mb": 500.0}
+    results = {"getitem_cold_s": 0.11, "dataloader_2_workers_samples_per_s": 70.0, "getitem_peak_rss_mb": 700.0, "new_s": 1.0}
+    worse = regressions(results, baseline, tolerance=0.2)
+    assert [line.split(":")[0] for line in worse] == ["dataloader_2_workers_samples_per_s", "getitem_peak_rss_mb"]
+    assert regressions(baseline, baseline, tolerance=0.0) == []
+
+
+def test_make_tree_layout(tmp_path):
+    make_tree(tmp_path, n_groups=2, size=16)
+    assert len(list((tmp_path / "masks").iterdir())) == 2
+    assert len(list((tmp_path / "images" / "0000001").iterdir())) == 4
+
+
+def test_peak_rss_of_spawned_process_excludes_parent():
+    ballast = b"\1" * (256 * 2 ** 20)  # noqa: F841, raises the peak of this process
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+        child = executor.submit(peak_rss_mb).result()
+    assert child < peak_rss_mb() - 200
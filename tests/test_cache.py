@@ -0,0 +1,65 @@
+import os
+import time
+
+from ssl4eo_eu_forest.cache import TileCache, parse_size
+from tests.test_aio import make_remote_dataset
+from tests.test_dataset import make_cached_dataset
+
+
+def test_files_are_keyed_by_repo_path(tmp_path):
+    ds = make_cached_dataset(tmp_path, n_groups=1)
+    paths = [path for _, path in ds._group_files(0)]
+    assert paths[1] == str(tmp_path / ds.images["path"].iloc[0])
+    assert len(set(paths)) == 3
+    usage = ds.tile_cache.usage()
+    assert usage["files"] == 3 and usage["bytes"] == sum(os.path.getsize(p) for p in paths)
+
+
+def test_verify_and_repair(tmp_path, http_server):
+    ds, server = make_remote_dataset(tmp_path, http_server)
+    ds.prefetch(max_workers=2)
+    assert ds.tile_cache.verify(ds, progress=False) == []
+
+    _, mask_path = ds._group_files(1)[0]
+    _, image_path = ds._group_files(2)[2]
+    with open(mask_path, "r+b") as f:
+        f.truncate(os.path.getsize(mask_path) // 2)
+    with open(image_path, "wb") as f:
+        f.write(b"garbage")
+
+    problems = ds.tile_cache.verify(ds, progress=False)
+    assert sorted(path for _, path, _ in problems) == sorted([mask_path, image_path])
+    assert len(ds.tile_cache.repair(problems, progress=False)) == 2
+    assert ds.tile_cache.verify(ds, progress=False) == []
+    assert ds[2]["image"][1].int().unique().tolist() == [202]
+
+
+def test_quota_while_loading(tmp_path, http_server):
+    ds, _ = make_remote_dataset(tmp_path, http_server)
+    group_bytes = sum(os.path.getsize(http_server[1] / path) for path in [ds.df["mask_path"].iat[0], *ds.images["path"][:2]])
+    ds.tile_cache.max_bytes = 2 * group_bytes
+    for idx in range(3):
+        assert ds[idx]["image"][0].int().unique().tolist() == [100 + idx]
+    assert ds.tile_cache.usage()["bytes"] <= 2 * group_bytes
+
+
+def test_quota_evicts_least_recently_used(tmp_path):
+    ds = make_cached_dataset(tmp_path, n_groups=3)
+    entries = sorted(ds.tile_cache.entries())
+    total = sum(size for _, size, _ in entries)
+    for i, (path, _, _) in enumerate(entries):
+        os.utime(path, (time.time() - 1000 + i, time.time() - 1000 + i))
+
+    cache = TileCache(str(tmp_path), max_bytes=total, low_water=0.5)
+    assert cache.evict() == []
+    cache.touch(entries[0][0])
+    removed = cache.evict(max_bytes=total // 2)
+    assert entries[0][0] not in removed
+    assert removed == [path for path, _, _ in entries[1:len(removed) + 1]]
+    assert cache.usage()["bytes"] <= total // 4 < cache.usage()["bytes"] + entries[len(removed)][1]
+
+
+def test_parse_size():
+    assert parse_size("1048576") == 1 << 20
+    assert parse_size("1.5G") == 3 << 29
+    assert parse_size("500GiB") == 500 << 30
@@ -0,0 +1,47 @@
+import numpy as np
+import rasterio
+from rasterio.windows import Window
+
+from ssl4eo_eu_forest.cog import is_cog, to_cog, convert_tree_to_cog
+from tests.test_aio import make_remote_dataset
+from tests.test_dataset import make_local_tree
+
+
+def test_convert_tree_to_cog(tmp_path):
+    base_dir = make_local_tree(tmp_path / "mirror", n_groups=2)
+    mask_path = base_dir / "masks" / "0000000" / "mask.tif"
+    with rasterio.open(mask_path) as src:
+        before, transform = src.read(), src.transform
+
+    converted = convert_tree_to_cog(str(base_dir), progress=False)
+    assert len(converted) == 2 * 3
+    assert is_cog(str(mask_path))
+    with rasterio.open(mask_path) as src:
+        assert np.array_equal(src.read(), before) and src.transform == transform
+    assert convert_tree_to_cog(str(base_dir), progress=False) == []
+
+
+def test_remote_reads_fetch_only_needed_ranges(tmp_path, http_server):
+    ds, server = make_remote_dataset(tmp_path, http_server, n_groups=1)
+    _, remote_dir, _ = http_server
+    rng = np.random.default_rng(0)
+    image_path = remote_dir / ds.images["path"].iloc[1]
+    with rasterio.open(image_path, "r+") as dst:
+        data = rng.integers(0, 10000, size=(dst.count, dst.height, dst.width), dtype=np.uint16)
+        dst.write(data)
+    for path in remote_dir.rglob("*.tif"):
+        to_cog(str(path), blocksize=128)
+
+    ds.remote_reads = True
+    server.requests.clear()
+    sample = ds.load_sample(0, bands=["B02", "B03"], window=(64, 128, 32, 32))
+
+    assert tuple(sample["image"].shape) == (2, 2, 32, 32)
+    assert np.array_equal(sample["image"][1].numpy(), data[[1, 2], 128:160, 64:96])
+    assert sample["metadata"][1]["transform"] == rasterio.open(image_path).window_transform(Window(64, 128, 32, 32))
+    # only byte ranges are requested and nothing lands in the disk cache
+    image_requests = [r for p, r in server.requests if p.endswith(image_path.name) and image_path.parent.name in p]
+    assert image_requests and all(r is not None for r in image_requests)
+    fetched = sum(int(end) - int(start) + 1 for start, end in (r[6:].split("-") for r in image_requests))
+    assert fetched < image_path.stat().st_size / 2
+    assert not (tmp_path / "cache" / "masks").exists()
@@ -0,0 +1,49 @@
+import torch
+from torch.utils.data import DataLoader
+
+from ssl4eo_eu_forest.collate import collate_seasonal, stack_padded
+from tests.test_dataset import make_cached_dataset
+
+
+def make_sample(group_id, seasons, size):
+    return {
+        "image": torch.ones((len(seasons), 12, *size), dtype=torch.uint16),
+        "mask": torch.ones((1, *size), dtype=torch.uint8),
+        "group_id": group_id,
+        "metadata": [
+            {"season": season, "timestamp_start": f"{season}-start", "timestamp_end": f"{season}-end",
+             "tile_id": "T32ULB", "shape": torch.Size((12, *size)), "crs": "EPSG:32632",
+             "transform": (10.0, 0.0, 500000.0, 0.0, -10.0, 5000000.0)}
+            for season in seasons
+        ]
+    }
+
+
+def test_collate_seasonal_layout_and_padding():
+    batch = collate_seasonal([
+        make_sample("a", ["summer", "winter", "summer"], (264, 264)),
+        make_sample("b", ["fall"], (260, 262)),
+    ])
+    assert tuple(batch["image"].shape) == (2, 4, 12, 264, 264)
+    assert batch["image"].dtype == torch.uint16
+    assert batch["season_mask"].tolist() == [[True, False, True, False], [False, False, False, True]]
+    assert batch["valid"][1, :260, :262].all() and not batch["valid"][1, 260:].any()
+    assert not batch["image"][1, 3, :, 260:].any()
+    assert batch["group_id"] == ["a", "b"]
+    assert batch["metadata"]["tile_id"][1] == [None, None, None, "T32ULB"]
+    assert batch["metadata"]["transform"][0, 0, 2] == 500000.0
+    assert torch.isnan(batch["metadata"]["transform"][0, 1]).all()
+    assert batch["metadata"]["shape"][1, 3].tolist() == [12, 260, 262]
+
+
+def test_stack_padded():
+    out = stack_padded([torch.ones((2, 3, 4)), torch.ones((2, 4, 3))])
+    assert tuple(out.shape) == (2, 2, 4, 4)
+    assert out[0, :, 3].sum() == 0 and out[1, :, :, 3].sum() == 0
+
+
+def test_dataloader_batches(tmp_path):
+    ds = make_cached_dataset(tmp_path, n_groups=3, crop_size=32)
+    batch = next(iter(DataLoader(ds, batch_size=3, collate_fn=collate_seasonal)))
+    assert tuple(batch["image"].shape) == (3, 4, 12, 32, 32)
+    assert batch["season_mask"][:, [0, 2]].all()
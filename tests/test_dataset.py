@@ -1,5 +1,69 @@
 from ssl4eo_eu_forest.dataset import SSL4EOEUForestTG
+from ssl4eo_eu_forest.utils import get_bbox_epsg4326, metadata_jsonl_from_ssl4eo_eu_forest_dir
+from tests.test_utils import create_dummy_tif
+from unittest.mock import patch
 import pytest
+import torch
+
+ACQUISITIONS = {
+    "winter": ("20180206T084129", "20180206T084229", "T32ULB"),
+    "summer": ("20180710T103021", "20180710T103025", "T32ULB"),
+}
+
+
+def make_cached_dataset(root, n_groups=2, seasons=("winter", "summer"), **kwargs):
+    """Dataset over n_groups side-by-side groups whose files are already in the cache under root."""
+    rows = []
+    for i in range(n_groups):
+        group_id = f"{i:07d}"
+        origin = (500000 + i * 2640, 5000000)
+        mask_path = root / "masks" / group_id / "mask.tif"
+        mask_path.parent.mkdir(parents=True)
+        create_dummy_tif(mask_path, origin=origin, fill=1)
+        images = {"path": [], "timestamp_start": [], "timestamp_end": [], "tile_id": [],
+                  "season": [], "width": [], "height": []}
+        for j, season in enumerate(seasons):
+            start, end, tile_id = ACQUISITIONS[season]
+            path = f"images/{group_id}/{start}_{end}_{tile_id}/all_bands.tif"
+            (root / path).parent.mkdir(parents=True)
+            create_dummy_tif(root / path, origin=origin, count=12, fill=100 * (j + 1) + i)
+            images["path"].append(path)
+            images["timestamp_start"].append(start)
+            images["timestamp_end"].append(end)
+            images["tile_id"].append(tile_id)
+            images["season"].append(season)
+            images["width"].append(264)
+            images["height"].append(264)
+        rows.append({
+            "group_id": group_id,
+            "mask_path": f"masks/{group_id}/mask.tif",
+            "bbox_epsg4326": get_bbox_epsg4326(mask_path),
+            "mask_width": 264,
+            "mask_height": 264,
+            "dimensions_match": True,
+            "images": images
+        })
+
+    with patch("ssl4eo_eu_forest.metadata.load_dataset", return_value={"train": rows}):
+        return SSL4EOEUForestTG(root=str(root), **kwargs)
+
+
+def make_local_tree(base_dir, n_groups=2, seasons=("winter", "summer"), build_metadata=True):
+    """Dataset tree in the layout of utils.process_group with n_groups side-by-side groups."""
+    for i in range(n_groups):
+        group_id = f"{i:07d}"
+        origin = (500000 + i * 2640, 5000000)
+        (base_dir / "masks" / group_id).mkdir(parents=True)
+        create_dummy_tif(base_dir / "masks" / group_id / "mask.tif", origin=origin, fill=1)
+        for j, season in enumerate(seasons):
+            start, end, tile_id = ACQUISITIONS[season]
+            image_dir = base_dir / "images" / group_id / f"{start}_{end}_{tile_id}"
+            image_dir.mkdir(parents=True)
+            create_dummy_tif(image_dir / "all_bands.tif", origin=origin, count=12, fill=100 * (j + 1) + i)
+    if build_metadata:
+        metadata_jsonl_from_ssl4eo_eu_forest_dir(str(base_dir))
+    return base_dir
+
 
 def test_dataset_loads():
     try:
@@ -12,3 +76,78 @@ def test_dataset_loads():
         else:
             raise
 
+
+def test_integer_index_from_cache(tmp_path):
+    ds = make_cached_dataset(tmp_path)
+    assert len(ds) == 2
+    sample = ds[1]
+    assert tuple(sample["image"].shape) == (2, 12, 264, 264)
+    assert tuple(sample["mask"].shape) == (1, 264, 264)
+    assert [m["season"] for m in sample["metadata"]] == ["winter", "summer"]
+
+
+def test_spatiotemporal_index_and_lookups(tmp_path):
+    ds = make_cached_dataset(tmp_path, n_groups=3)
+    assert len(ds.index) == 6
+    assert list(ds.query(seasons="summer")) == [0, 1, 2]
+    assert list(ds.query(region=ds.df.geometry.iloc[0].centroid.buffer(1e-4))) == [0]
+    assert list(ds.query(time_range=("2018-07-01", "2018-07-31"), tile_ids="T32ULB")) == [0, 1, 2]
+    assert len(ds.query(time_range=("2019-01-01", "2019-12-31"))) == 0
+
+
+def test_bbox_query_across_groups(tmp_path):
+    from torchgeo.samplers import RandomGeoSampler, GridGeoSampler
+
+    ds = make_cached_dataset(tmp_path)
+    left, right = ds.df.geometry.iloc[0].bounds, ds.df.geometry.iloc[1].bounds
+    xmid, ymid = (left[2] + right[0]) / 2, (left[1] + left[3]) / 2
+    size = 32 * ds.res[0]
+    t = ds.index.index[ds.index["season"] == "summer"][0]
+    sample = ds[xmid - size / 2:xmid + size / 2, ymid - size / 2:ymid + size / 2, t.left:t.right]
+
+    assert sample["group_ids"] == ["0000000", "0000001"]
+    assert [m["season"] for m in sample["metadata"]] == ["summer"]
+    assert tuple(sample["image"].shape[:2]) == (1, 12)
+    assert set(sample["image"].int().unique().tolist()) <= {0, 200, 201}
+    assert {200, 201} <= set(sample["image"].int().unique().tolist())
+
+    for query in RandomGeoSampler(ds, size=16, length=3):
+        assert ds[query]["image"].shape[-2:] == (16, 16)
+    assert len(list(GridGeoSampler(ds, size=128, stride=128))) > 0
+
+
+def test_band_subset_and_windowed_reads(tmp_path):
+    ds = make_cached_dataset(tmp_path, bands=["B02", "B03", "B04", "B08"], crop_size=64)
+    sample = ds[0]
+    assert tuple(sample["image"].shape) == (2, 4, 64, 64)
+    assert tuple(sample["mask"].shape) == (1, 64, 64)
+    assert set(ds.rgb_from_samples(sample)) == {"winter", "summer", "mask"}
+
+    # only the red band B04 varies, it must end up in the first channel
+    image = torch.zeros(2, 4, 8, 8, dtype=torch.uint16)
+    image[:, 2] = torch.arange(64).view(8, 8)
+    rgb = ds.rgb_from_samples({**sample, "image": image, "mask": torch.zeros(1, 8, 8, dtype=torch.uint8)})
+    assert rgb["winter"][..., 0].max() > 0 and rgb["winter"][..., 1:].max() == 0
+
+    sample = ds.load_sample(1, bands=["B11"], window=(10, 20, 32, 16))
+    assert tuple(sample["image"].shape) == (2, 1, 16, 32)
+    transform = sample["metadata"][0]["transform"]
+    assert (transform.c, transform.f) == (500000 + 2640 + 100, 5000000 - 200)
+
+    with pytest.raises(ValueError):
+        ds.load_sample(0, bands=["B13"])
+
+
+def test_local_mirror_mode(tmp_path):
+    local_dir = make_local_tree(tmp_path / "mirror")
+    root = tmp_path / "cache"
+    with patch("ssl4eo_eu_forest.metadata.load_dataset", side_effect=AssertionError("no Hub access")):
+        ds = SSL4EOEUForestTG(root=str(root), local_dir=str(local_dir))
+        sample = ds[1]
+        assert ds.prefetch() == 0
+        assert len(SSL4EOEUForestTG(root=str(root), local_dir=str(local_dir))) == 2
+
+    assert tuple(sample["image"].shape) == (2, 12, 264, 264)
+    summer = [m["season"] for m in sample["metadata"]].index("summer")
+    assert sample["image"][summer].int().unique().tolist() == [201]
+    assert [p.name for p in root.iterdir()] == [".metadata"]
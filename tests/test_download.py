@@ -0,0 +1,54 @@
+import os
+import hashlib
+import pytest
+
+from ssl4eo_eu_forest.download import DownloadError, download_file, download_files
+
+
+def test_download_file_atomic(http_server, tmp_path):
+    base_url, remote, _ = http_server
+    payload = os.urandom(3 * 1024 * 1024 + 17)
+    (remote / "all_bands.tif").write_bytes(payload)
+
+    path = tmp_path / "cache" / "0000001" / "summer.tif"
+    download_file(f"{base_url}/all_bands.tif", str(path), chunk_size=1024 * 1024)
+    assert path.read_bytes() == payload
+    assert not os.path.exists(f"{path}.part")
+
+
+def test_download_file_resumes_part(http_server, tmp_path):
+    base_url, remote, server = http_server
+    payload = os.urandom(100_000)
+    (remote / "mask.tif").write_bytes(payload)
+
+    path = tmp_path / "mask.tif"
+    with open(f"{path}.part", "wb") as f:
+        f.write(payload[:40_000])
+    download_file(f"{base_url}/mask.tif", str(path), sha256=hashlib.sha256(payload).hexdigest())
+    assert path.read_bytes() == payload
+    assert server.requests[-1] == ("/mask.tif", "bytes=40000-")
+
+
+def test_download_file_rejects_bad_checksum(http_server, tmp_path):
+    base_url, remote, _ = http_server
+    (remote / "mask.tif").write_bytes(b"not the expected content")
+
+    path = tmp_path / "mask.tif"
+    with pytest.raises(DownloadError):
+        download_file(f"{base_url}/mask.tif", str(path), sha256="0" * 64, retries=1, backoff=0)
+    assert not path.exists()
+
+
+def test_download_files_parallel(http_server, tmp_path):
+    base_url, remote, _ = http_server
+    jobs = []
+    for i in range(10):
+        (remote / f"{i}.tif").write_bytes(bytes([i]) * 5000)
+        jobs.append((f"{base_url}/{i}.tif", str(tmp_path / "cache" / f"{i}.tif")))
+
+    assert len(download_files(jobs, max_workers=4, progress=False)) == 10
+    assert download_files(jobs, max_workers=4, progress=False) == []
+    assert (tmp_path / "cache" / "7.tif").read_bytes() == bytes([7]) * 5000
+
+    with pytest.raises(DownloadError):
+        download_files([(f"{base_url}/missing.tif", str(tmp_path / "missing.tif"))], retries=0, progress=False)
@@ -0,0 +1,23 @@
+import json
+import subprocess
+import sys
+
+HEAVY = ("torch", "torchgeo", "geopandas", "folium", "datasets", "huggingface_hub", "requests")
+
+
+def imported_modules(statement):
+    """Heavy modules in sys.modules after running statement in a fresh interpreter."""
+    code = f"import sys, json; {statement}; print(json.dumps([m for m in {HEAVY!r} if m in sys.modules]))"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_package_and_utils_import_without_heavy_dependencies():
+    assert imported_modules("import ssl4eo_eu_forest") == []
+    assert imported_modules("from ssl4eo_eu_forest.utils import get_season, metadata_jsonl_from_ssl4eo_eu_forest_dir") == []
+
+
+def test_dataset_defers_folium_and_hub_clients():
+    loaded = imported_modules("from ssl4eo_eu_forest import SSL4EOEUForestTG")
+    assert "torchgeo" in loaded
+    assert not {"folium", "datasets", "huggingface_hub"} & set(loaded)
@@ -0,0 +1,44 @@
+import logging
+from torch.utils.data import DataLoader
+
+from ssl4eo_eu_forest.dataset import SSL4EOEUForestTG
+from ssl4eo_eu_forest.instrument import Timings
+from tests.test_dataset import make_local_tree
+
+
+def test_timings_summary_and_prometheus(tmp_path):
+    timings = Timings()
+    with timings.stage("decode"):
+        pass
+    timings.add("download", 0.5, 1024)
+    timings.add_sample()
+
+    summary = timings.summary()
+    assert summary["decode"]["count"] == 1
+    assert summary["download"] == {"count": 1, "seconds": 0.5, "bytes": 1024, "seconds_per_sample": 0.5}
+
+    timings.write_prometheus(str(tmp_path / "metrics.prom"))
+    text = (tmp_path / "metrics.prom").read_text()
+    assert 'ssl4eo_eu_forest_stage_bytes_total{stage="download"} 1024' in text
+    assert "ssl4eo_eu_forest_samples_total 1" in text
+    timings.reset()
+    assert timings.samples == 0 and timings.summary()["download"]["bytes"] == 0
+
+
+def test_dataset_timings_aggregate_across_workers(tmp_path):
+    local_dir = make_local_tree(tmp_path / "mirror", n_groups=4)
+    ds = SSL4EOEUForestTG(root=str(tmp_path / "cache"), local_dir=str(local_dir), crop_size=32, instrument=True)
+    assert not logging.getLogger("SSL4EOEUForestTG").isEnabledFor(logging.DEBUG)
+
+    loader = DataLoader(ds, batch_size=2, num_workers=2, collate_fn=lambda batch: batch)
+    assert sum(len(batch) for batch in loader) == 4
+
+    summary = ds.timings.summary()
+    assert ds.timings.samples == 4
+    assert summary["open"]["count"] == 4
+    assert summary["decode"]["count"] == 4 * 3
+    assert summary["decode"]["seconds"] > 0
+    assert summary["download"]["count"] == 0
+
+    uninstrumented = SSL4EOEUForestTG(root=str(tmp_path / "cache"), local_dir=str(local_dir))
+    assert uninstrumented.timings is None and uninstrumented[0]["image"].shape[0] == 2
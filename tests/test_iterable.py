@@ -0,0 +1,89 @@
+import json
+import shutil
+from unittest.mock import patch
+
+import pytest
+import torch
+from datasets import IterableDataset
+from torch.utils.data import DataLoader
+
+from ssl4eo_eu_forest import SSL4EOEUForestStream, SSL4EOEUForestTG
+from ssl4eo_eu_forest.collate import collate_seasonal
+from tests.test_dataset import make_local_tree
+
+
+def test_stream_matches_dataset(tmp_path):
+    local_dir = make_local_tree(tmp_path / "mirror", n_groups=3)
+    ds = SSL4EOEUForestTG(root=str(tmp_path / "cache"), local_dir=str(local_dir), bands=["B02", "B03"])
+    stream = SSL4EOEUForestStream(root=str(tmp_path / "cache"), local_dir=str(local_dir), bands=["B02", "B03"])
+
+    samples = list(stream)
+    assert [s["group_id"] for s in samples] == ["0000000", "0000001", "0000002"]
+    expected = ds.load_sample(1)
+    assert torch.equal(samples[1]["image"], expected["image"]) and torch.equal(samples[1]["mask"], expected["mask"])
+    assert samples[1]["metadata"][0]["transform"] == expected["metadata"][0]["transform"]
+
+    cropped = next(iter(SSL4EOEUForestStream(root=str(tmp_path / "cache"), local_dir=str(local_dir), crop_size=32)))
+    assert tuple(cropped["image"].shape) == (2, 12, 32, 32)
+
+
+def test_shuffle_buffer_and_workers(tmp_path):
+    local_dir = make_local_tree(tmp_path / "mirror", n_groups=8)
+    stream = SSL4EOEUForestStream(root=str(tmp_path / "cache"), local_dir=str(local_dir), shuffle_buffer=4, seed=3)
+
+    first = [s["group_id"] for s in stream]
+    assert sorted(first) == [f"{i:07d}" for i in range(8)] and first != sorted(first)
+    assert [s["group_id"] for s in stream] == first
+    stream.set_epoch(1)
+    assert [s["group_id"] for s in stream] != first
+
+    loader = DataLoader(stream, batch_size=2, num_workers=2, collate_fn=collate_seasonal)
+    group_ids = [group_id for batch in loader for group_id in batch["group_id"]]
+    assert sorted(group_ids) == [f"{i:07d}" for i in range(8)]
+
+
+def test_hub_stream_is_lazy(tmp_path, http_server):
+    base_url, remote_dir, server = http_server
+    local_dir = make_local_tree(tmp_path / "mirror", n_groups=6)
+    for top in ("masks", "images"):
+        shutil.copytree(local_dir / top, remote_dir / top)
+    rows = [json.loads(line) for line in (local_dir / "meta.jsonl").read_text().splitlines()]
+    pulled = []
+
+    def stream_rows():
+        for row in rows:
+            pulled.append(row["group_id"])
+            yield row
+
+    stream = SSL4EOEUForestStream(root=str(tmp_path / "cache"), prefetch=2)
+    stream.url_prefix = f"{base_url}/"
+    with patch("ssl4eo_eu_forest.iterable.load_dataset", return_value={"train": stream_rows()}):
+        sample = next(iter(stream))
+    assert sample["group_id"] == "0000000"
+    assert sample["image"][1].int().unique().tolist() == [200]
+    assert len(pulled) <= 3
+    assert (tmp_path / "cache" / rows[0]["mask_path"]).exists()
+
+
+def _generate_rows(shards):
+    for shard in shards:
+        yield from shard
+
+
+@pytest.mark.parametrize("n_shards", [1, 2])
+def test_hub_stream_with_workers(tmp_path, http_server, n_shards):
+    base_url, remote_dir, _ = http_server
+    local_dir = make_local_tree(tmp_path / "mirror", n_groups=8)
+    for top in ("masks", "images"):
+        shutil.copytree(local_dir / top, remote_dir / top)
+    rows = [json.loads(line) for line in (local_dir / "meta.jsonl").read_text().splitlines()]
+    # HF hands every DataLoader worker its own shards, they must not be split again
+    hub = IterableDataset.from_generator(_generate_rows, gen_kwargs={"shards": [rows[i::n_shards] for i in range(n_shards)]})
+    assert hub.n_shards == n_shards
+
+    stream = SSL4EOEUForestStream(root=str(tmp_path / "cache"), bands=["B02"], crop_size=16, shuffle_buffer=2)
+    stream.url_prefix = f"{base_url}/"
+    loader = DataLoader(stream, batch_size=2, num_workers=2, collate_fn=collate_seasonal)
+    with patch("ssl4eo_eu_forest.iterable.load_dataset", return_value={"train": hub}):
+        group_ids = [group_id for batch in loader for group_id in batch["group_id"]]
+    assert sorted(group_ids) == [f"{i:07d}" for i in range(8)]
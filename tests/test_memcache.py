@@ -0,0 +1,59 @@
+import os
+import torch
+from torch.utils.data import DataLoader
+
+from ssl4eo_eu_forest.memcache import SampleCache, sample_nbytes
+from tests.test_dataset import make_local_tree
+from ssl4eo_eu_forest.dataset import SSL4EOEUForestTG
+
+
+def make_sample(n):
+    return {"image": torch.zeros(n, dtype=torch.uint8), "mask": torch.zeros(0, dtype=torch.uint8), "metadata": []}
+
+
+def test_sample_cache_lru_eviction():
+    cache = SampleCache(max_bytes=250)
+    cache.put("a", make_sample(100))
+    cache.put("b", make_sample(100))
+    assert cache.get("a") is not None  # "b" becomes least recently used
+    cache.put("c", make_sample(100))
+    assert "b" not in cache and "a" in cache and "c" in cache
+    assert cache.nbytes == 200
+    cache.put("huge", make_sample(1000))
+    assert "huge" not in cache
+    assert cache.get("b") is None
+    assert cache.stats() == {"hits": 1, "misses": 1, "entries": 2, "bytes": 200}
+    assert cache.get("a")["image"].is_shared()
+
+
+def test_sample_cache_single_shared_buffer():
+    cache = SampleCache(max_bytes=1 << 20)
+    cache.put(0, make_sample(100))
+    fds = len(os.listdir("/proc/self/fd"))
+    for i in range(1, 500):
+        cache.put(i, make_sample(1000))
+    assert len(os.listdir("/proc/self/fd")) == fds
+    assert len(cache) == 500 and cache.get(499)["image"].is_shared()
+    # evicted ranges are reused once the arena is full
+    for i in range(500, 2000):
+        cache.put(i, make_sample(1000))
+    assert cache.nbytes <= cache.max_bytes
+    assert torch.equal(cache.get(1999)["image"], torch.zeros(1000, dtype=torch.uint8))
+    cache.clear()
+    assert len(cache) == 0 and cache._free == [(0, len(cache._arena))]
+
+
+def test_dataset_cache_shared_with_workers(tmp_path):
+    local_dir = make_local_tree(tmp_path / "mirror", n_groups=3)
+    ds = SSL4EOEUForestTG(root=str(tmp_path / "cache"), local_dir=str(local_dir),
+                          bands=["B02", "B03"], crop_size=32, cache_bytes=64 * 1024 ** 2)
+    stats = ds.warm_cache()
+    assert stats["entries"] == 3 and stats["misses"] == 3
+    assert stats["bytes"] == 3 * sample_nbytes(ds.load_sample(0, window=(0, 0, 264, 264)))
+
+    loader = DataLoader(ds, batch_size=1, num_workers=2, collate_fn=lambda batch: batch[0])
+    for sample in loader:
+        assert tuple(sample["image"].shape) == (2, 2, 32, 32)
+    # every worker read hit the cache filled before they forked
+    assert ds.sample_cache.stats()["hits"] == 1 + 3
+    assert ds.sample_cache.stats()["misses"] == 3
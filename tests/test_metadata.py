@@ -0,0 +1,85 @@
+import os
+from unittest.mock import patch
+
+import pandas as pd
+
+from ssl4eo_eu_forest.metadata import (
+    load_metadata, metadata_cache_path, metadata_tables, metadata_frames,
+    read_metadata_cache, write_metadata_cache, _images_cache_path
+)
+
+
+def make_row(group_id):
+    return {
+        "group_id": group_id,
+        "mask_path": f"masks/{group_id}/mask.tif",
+        "bbox_epsg4326": [6.0, 50.0, 6.1, 50.1],
+        "mask_width": 264,
+        "mask_height": 264,
+        "dimensions_match": True,
+        "images": {
+            "path": [f"images/{group_id}/20180206T084129_20180206T084229_T36SVF/all_bands.tif"],
+            "timestamp_start": ["20180206T084129"],
+            "timestamp_end": ["20180206T084229"],
+            "tile_id": ["T36SVF"],
+            "season": ["winter"],
+            "width": [264],
+            "height": [264]
+        }
+    }
+
+
+def test_metadata_cache_roundtrip(tmp_path):
+    rows = {"train": [make_row("0000001"), make_row("0000002")]}
+    with patch("ssl4eo_eu_forest.metadata.load_dataset", return_value=rows) as hub:
+        df = load_metadata(str(tmp_path), "dm4eo/ssl4eo_eu_forest", "v1.0")
+        cached = load_metadata(str(tmp_path), "dm4eo/ssl4eo_eu_forest", "v1.0")
+        assert hub.call_count == 1
+
+    (df, images), (cached, cached_images) = df, cached
+    assert (tmp_path / ".metadata").is_dir()
+    assert list(cached.group_id) == list(df.group_id)
+    assert cached.crs == df.crs
+    assert cached.geometry.iloc[0].equals(df.geometry.iloc[0])
+    assert list(cached.image_start) == [0, 1] and list(cached.image_count) == [1, 1]
+    assert cached_images.season.tolist() == images.season.tolist() == ["winter", "winter"]
+    assert isinstance(cached.group_id.dtype, pd.ArrowDtype)
+
+
+def test_metadata_cache_follows_revision(tmp_path):
+    rows = {"train": [make_row("0000001")]}
+    with patch("ssl4eo_eu_forest.metadata.load_dataset", return_value=rows) as hub:
+        load_metadata(str(tmp_path), "dm4eo/ssl4eo_eu_forest", "v1.0")
+        load_metadata(str(tmp_path), "dm4eo/ssl4eo_eu_forest", "v1.1")
+        load_metadata(str(tmp_path), "dm4eo/ssl4eo_eu_forest", "v1.1", refresh=True)
+        assert hub.call_count == 3
+
+    assert metadata_cache_path("r", "a/b", "v1.0") != metadata_cache_path("r", "a/b", "v1.1")
+
+
+def test_metadata_cache_rejects_tables_of_different_builds(tmp_path):
+    path = str(tmp_path / "cache.feather")
+    write_metadata_cache(metadata_tables([make_row("0000001")]), path)
+    assert read_metadata_cache(path) is not None
+
+    # a concurrent rebuild replaced only the image table so far
+    other = str(tmp_path / "other.feather")
+    write_metadata_cache(metadata_tables([make_row("0000002"), make_row("0000003")]), other)
+    os.replace(_images_cache_path(other), _images_cache_path(path))
+    assert read_metadata_cache(path) is None
+
+
+def test_metadata_tables_flatten_images():
+    rows = [make_row("0000001"), make_row("0000002")]
+    rows[1]["images"] = [
+        {key: values[0] for key, values in rows[1]["images"].items()},
+        {**{key: values[0] for key, values in rows[1]["images"].items()}, "season": "summer"}
+    ]
+    groups, images = metadata_tables(rows)
+    assert groups.column("image_start").to_pylist() == [0, 1]
+    assert groups.column("image_count").to_pylist() == [1, 2]
+    assert images.column("season").to_pylist() == ["winter", "winter", "summer"]
+
+    df, _ = metadata_frames(groups, images)
+    assert df.geometry.iloc[1].bounds == (6.0, 50.0, 6.1, 50.1)
+    assert "minx" not in df.columns
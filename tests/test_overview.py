@@ -0,0 +1,37 @@
+import numpy as np
+import geopandas as gpd
+import shapely
+
+from ssl4eo_eu_forest.overview import footprint_grid, overview_map
+from tests.test_dataset import make_cached_dataset
+
+
+def make_footprints(n):
+    xs = 5 + (7 * np.arange(n) % 1000) / 100
+    return gpd.GeoDataFrame(
+        {"group_id": [f"{i:07d}" for i in range(n)]},
+        geometry=shapely.box(xs, 50, xs + 0.02, 50.02),
+        crs="EPSG:4326"
+    )
+
+
+def test_footprint_grid_is_bounded():
+    df = make_footprints(20000)
+    grid = footprint_grid(df, max_cells=100)
+    assert len(grid) <= 100 and grid["count"].sum() == 20000
+    assert grid.attrs["cell_size"] > 1 / 64
+    coarse = footprint_grid(df, cell_size=1.0)
+    assert coarse["count"].sum() == 20000 and len(coarse) <= 11
+
+
+def test_overview_map_size_and_filters(tmp_path):
+    small = overview_map(make_footprints(10)).get_root().render()
+    assert "0000009" in small
+
+    large = overview_map(make_footprints(200000), max_cells=500).get_root().render()
+    assert len(large) < 1_000_000 and "0199999" not in large
+
+    ds = make_cached_dataset(tmp_path / "cache", n_groups=3)
+    assert ds.group_position("0000002") == 2
+    assert "0000001" in ds.show_overview_folium(seasons="summer").get_root().render()
+    assert "0000001" not in ds.show_overview_folium(tile_ids="T32ULB", max_footprints=0).get_root().render()
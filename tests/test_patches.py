@@ -0,0 +1,49 @@
+import numpy as np
+import rasterio
+import torch
+from unittest.mock import patch
+
+from ssl4eo_eu_forest import SSL4EOEUForestPatches, SSL4EOEUForestTG
+from tests.test_dataset import make_local_tree
+
+
+def make_patch_tree(tmp_path):
+    """Two groups, the right half of the first mask is non-forest."""
+    local_dir = make_local_tree(tmp_path / "mirror", n_groups=2)
+    with rasterio.open(local_dir / "masks" / "0000000" / "mask.tif", "r+") as dst:
+        mask = dst.read()
+        mask[:, :, 132:] = 0
+        dst.write(mask)
+    return SSL4EOEUForestTG(root=str(tmp_path / "cache"), local_dir=str(local_dir), bands=["B02", "B03"])
+
+
+def test_patch_index_and_forest_filter(tmp_path):
+    ds = make_patch_tree(tmp_path)
+    patches = SSL4EOEUForestPatches(ds, patch_size=64)
+    assert len(patches) == 2 * 4 * 4
+    fractions = patches.patches["forest_fraction"].reshape(2, 4, 4)
+    assert np.allclose(fractions[0, :, :2], 1) and np.allclose(fractions[0, :, 3], 0)
+    assert np.isclose(fractions[0, 0, 2], 4 / 64)
+    assert np.allclose(fractions[1], 1)
+
+    # the index is cached under root, filters and strides reuse or extend it
+    with patch("ssl4eo_eu_forest.patches._group_patches") as build:
+        forest = SSL4EOEUForestPatches(ds, patch_size=64, min_forest_fraction=0.5)
+        build.assert_not_called()
+    assert len(forest) == 2 * 4 * 4 - 8
+    assert len(SSL4EOEUForestPatches(ds, patch_size=64, stride=32)) == 2 * 7 * 7
+
+    weights = patches.sample_weights()
+    assert np.isclose(weights[patches.patches["forest_fraction"] < 0.1].sum(), 1)
+    assert np.isclose(weights.sum(), 2)  # two occupied bins
+
+
+def test_patch_samples_are_windowed_reads(tmp_path):
+    ds = make_patch_tree(tmp_path)
+    patches = SSL4EOEUForestPatches(ds, patch_size=64)
+    sample = patches[4 * 4 + 5]
+    assert sample["group_id"] == "0000001" and sample["patch"] == (64, 64)
+    assert tuple(sample["image"].shape) == (2, 2, 64, 64)
+    expected = ds.load_sample(1, window=(64, 64, 64, 64))
+    assert torch.equal(sample["image"], expected["image"])
+    assert sample["metadata"][0]["transform"] == expected["metadata"][0]["transform"]
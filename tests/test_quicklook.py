@@ -0,0 +1,33 @@
+import numpy as np
+import torch
+from PIL import Image
+
+from ssl4eo_eu_forest.dataset import SSL4EOEUForestTG
+from ssl4eo_eu_forest.quicklook import normalize_rgb, percentile_bounds, write_quicklooks
+from tests.test_dataset import make_local_tree
+
+
+def test_percentiles_are_batched_and_unbounded():
+    image = torch.arange(1000, dtype=torch.int32).repeat(2, 3, 1).reshape(2, 3, 10, 100).to(torch.uint16)
+    low, high = percentile_bounds(image)
+    assert low.shape == (2, 3, 1, 1)
+    assert low.flatten().tolist() == [20] * 6 and high.flatten().tolist() == [979] * 6
+
+    # far above the ~16M element limit of torch.quantile
+    big = torch.randint(0, 10000, (2, 4, 3, 1024, 1024), dtype=torch.int32).to(torch.uint16)
+    rgb = normalize_rgb(big)
+    assert rgb.shape == big.shape and rgb.dtype == torch.float32
+    assert 0 <= rgb.min() and rgb.max() <= 1
+    assert abs(rgb.mean().item() - 0.5) < 0.01
+
+
+def test_write_quicklooks(tmp_path):
+    local_dir = make_local_tree(tmp_path / "mirror", n_groups=3)
+    ds = SSL4EOEUForestTG(root=str(tmp_path / "cache"), local_dir=str(local_dir))
+
+    written = write_quicklooks(ds, str(tmp_path / "ql"), thumbnail_size=64, max_workers=2, progress=False)
+    assert sorted(written) == [str(tmp_path / "ql" / f"{i:07d}.png") for i in range(3)]
+    with Image.open(written[0]) as image:
+        assert image.size == (3 * 64, 64)
+        assert np.asarray(image)[:, 2 * 64:].max() == 255  # mask panel
+    assert write_quicklooks(ds, str(tmp_path / "ql"), progress=False) == []
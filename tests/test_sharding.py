@@ -0,0 +1,87 @@
+from collections import Counter
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+from torch.utils.data import DataLoader, IterableDataset
+
+from ssl4eo_eu_forest.sharding import ShardedSampler, group_shards, worker_shard
+from tests.test_aio import make_remote_dataset
+
+
+def make_index(n_groups):
+    return SimpleNamespace(df=pd.DataFrame({"group_id": [f"{i:07d}" for i in range(n_groups)]}))
+
+
+def test_group_shards_are_stable():
+    ids = [f"{i:07d}" for i in range(1000)]
+    shards = group_shards(ids, 4)
+    assert set(shards.tolist()) == {0, 1, 2, 3}
+    assert all(180 < count < 320 for count in Counter(shards.tolist()).values())
+    # adding groups does not move existing ones
+    assert (group_shards(ids + ["9999999"], 4)[:1000] == shards).all()
+
+
+def test_simulated_world():
+    ds = make_index(1000)
+    num_nodes, local_world_size = 3, 2
+    samplers = [
+        [ShardedSampler(ds, num_nodes, node, local_world_size, rank, seed=1) for rank in range(local_world_size)]
+        for node in range(num_nodes)
+    ]
+    lengths = {len(s) for node in samplers for s in node}
+    assert len(lengths) == 1
+
+    for epoch in range(2):
+        for node in samplers:
+            for sampler in node:
+                sampler.set_epoch(epoch)
+        node_sets = [set().union(*(list(s) for s in node)) for node in samplers]
+        # nodes read disjoint groups, and together all of them
+        assert sum(len(s) for s in node_sets) == len(set().union(*node_sets)) == 1000
+        assert all(set(node_sets[n]) == set(samplers[n][0].node_indices.tolist()) for n in range(num_nodes))
+        assert all(len(list(s)) == len(s) for node in samplers for s in node)
+
+    sampler = samplers[0][0]
+    sampler.set_epoch(0)
+    first = list(sampler)
+    sampler.set_epoch(1)
+    assert list(sampler) != first and set(sampler.prefetch_indices()) <= set(sampler.node_indices)
+    prefetched = [set(s.prefetch_indices().tolist()) for s in samplers[0]]
+    assert not prefetched[0] & prefetched[1]
+    assert prefetched[0] | prefetched[1] == set(samplers[0][0].node_indices.tolist())
+
+    with pytest.raises(ValueError):
+        ShardedSampler(ds, 2, 2, 1, 0)
+
+
+def test_topology_from_environment(monkeypatch):
+    monkeypatch.setenv("WORLD_SIZE", "8")
+    monkeypatch.setenv("RANK", "5")
+    monkeypatch.setenv("LOCAL_WORLD_SIZE", "4")
+    sampler = ShardedSampler(make_index(10))
+    assert (sampler.num_nodes, sampler.node, sampler.local_world_size, sampler.local_rank) == (2, 1, 4, 1)
+
+
+class _Range(IterableDataset):
+    def __init__(self, n, stream=False):
+        self.n = n
+        self.stream = stream
+
+    def __iter__(self):
+        return iter(worker_shard(iter(range(self.n)) if self.stream else list(range(self.n))))
+
+
+def test_worker_shard():
+    assert sorted(DataLoader(_Range(10), num_workers=2, batch_size=None)) == list(range(10))
+    assert worker_shard([1, 2, 3]) == [1, 2, 3]
+    assert sorted(DataLoader(_Range(10, stream=True), num_workers=2, batch_size=None)) == list(range(10))
+
+
+def test_rank_prefetch_fills_node_cache_once(tmp_path, http_server):
+    ds, server = make_remote_dataset(tmp_path, http_server, n_groups=6)
+    samplers = [ShardedSampler(ds, 2, 0, 2, rank) for rank in range(2)]
+    fetched = sum(sampler.prefetch(ds, max_workers=2) for sampler in samplers)
+    assert fetched == 3 * len(samplers[0].node_indices)
+    assert len(server.requests) == fetched
+    assert ds.tile_cache.usage()["files"] == fetched
@@ -69,3 +69,54 @@ def test_generate_examples_streaming(tmp_path):
     idx, data = examples[0]
     assert data["group_id"] == "sample_001"
     assert data["images"][0]["season"] == "spring"
+
+
+def test_generate_examples_from_shards(tmp_path):
+    from ssl4eo_eu_forest.utils import metadata_parquet_from_jsonl
+
+    rows = []
+    for i in range(4):
+        rows.append({
+            "group_id": f"sample_{i:03d}",
+            "mask_path": f"masks/sample_{i:03d}/mask.tif",
+            "bbox_epsg4326": [6.0, 50.0, 6.1, 50.1],
+            "mask_width": 264,
+            "mask_height": 264,
+            "dimensions_match": True,
+            "images": [{
+                "path": f"images/sample_{i:03d}/20180206T084129_20180206T084229_T36SVF/all_bands.tif",
+                "timestamp_start": "20180206T084129",
+                "timestamp_end": "20180206T084229",
+                "tile_id": "T36SVF",
+                "season": "winter",
+                "width": 264,
+                "height": 264
+            }]
+        })
+    for shard in range(2):
+        with open(tmp_path / f"meta-{shard:05d}-of-00002.jsonl", "w", encoding="utf-8") as f:
+            for row in rows[2 * shard:2 * shard + 2]:
+                f.write(json.dumps(row) + "\n")
+    (tmp_path / "meta.jsonl").write_text("")
+
+    urls = ssl4eo_eu_forest.discover_metadata_files(str(tmp_path))
+    assert [u.rsplit("/", 1)[-1] for u in urls] == ["meta-00000-of-00002.jsonl", "meta-00001-of-00002.jsonl"]
+
+    gen = ssl4eo_eu_forest.SSL4EOEUForest()
+    examples = list(gen._generate_examples(urls))
+    assert [data["group_id"] for _, data in examples] == [row["group_id"] for row in rows]
+    assert len({key for key, _ in examples}) == 4
+
+    for url in urls:
+        metadata_parquet_from_jsonl(url)
+    urls = ssl4eo_eu_forest.discover_metadata_files(str(tmp_path))
+    assert all(u.endswith(".parquet") for u in urls)
+    examples = list(gen._generate_examples(urls))
+    assert [data for _, data in examples] == rows
+
+
+def test_hub_glob_base():
+    assert ssl4eo_eu_forest._hub_glob_base(
+        "https://huggingface.co/datasets/dm4eo/ssl4eo_eu_forest/resolve/v1.0"
+    ) == "hf://datasets/dm4eo/ssl4eo_eu_forest@v1.0"
+    assert ssl4eo_eu_forest._hub_glob_base("/data/ssl4eo") == "/data/ssl4eo"
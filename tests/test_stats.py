@@ -0,0 +1,52 @@
+import json
+import numpy as np
+import torch
+
+from ssl4eo_eu_forest.dataset import SSL4EOEUForestTG
+from ssl4eo_eu_forest.stats import BandStats, Normalize, band_stats_from_ssl4eo_eu_forest_dir, load_band_stats
+from tests.test_dataset import make_local_tree
+
+
+def test_merged_stats_match_numpy():
+    rng = np.random.default_rng(0)
+    images = [rng.integers(0, 3000, (3, 16, 16), dtype=np.uint16) for _ in range(4)]
+    stats = BandStats(3, nodata=None)
+    stats.update(images[0]).update(images[1])
+    stats.merge(BandStats(3, nodata=None).update(images[2]).update(images[3]))
+
+    pixels = np.concatenate([image.reshape(3, -1) for image in images], axis=1)
+    assert stats.count.tolist() == [1024] * 3
+    assert np.allclose(stats.mean, pixels.mean(axis=1))
+    assert np.allclose(stats.std, pixels.std(axis=1))
+    assert np.array_equal(stats.percentiles([50])[0], np.percentile(pixels, 50, axis=1, method="inverted_cdf"))
+
+    # nodata pixels are ignored
+    image = np.array([[[0, 0, 10, 20]]], dtype=np.uint16)
+    assert BandStats(1).update(image).mean.tolist() == [15]
+
+
+def test_band_stats_of_tree_and_normalize(tmp_path):
+    local_dir = make_local_tree(tmp_path / "mirror", n_groups=2)
+    stats = band_stats_from_ssl4eo_eu_forest_dir(str(local_dir), max_workers=2)
+    assert list(stats) == ["winter", "summer", "all"]
+    # winter images are filled with 100 + group, summer ones with 200 + group
+    assert np.allclose(stats["winter"].mean, 100.5) and np.allclose(stats["winter"].std, 0.5)
+    assert np.allclose(stats["all"].mean, 150.5)
+
+    with open(local_dir / "band_stats.json") as f:
+        summary = json.load(f)
+    assert summary["seasons"]["summer"]["percentiles"]["2"] == [200] * 12
+    assert np.array_equal(load_band_stats(str(local_dir / "band_stats.json"))["all"].histogram, stats["all"].histogram)
+
+    ds = SSL4EOEUForestTG(
+        root=str(tmp_path / "cache"), local_dir=str(local_dir), bands=["B02", "B03"],
+        transforms=Normalize(local_dir / "band_stats.json", bands=["B02", "B03"])
+    )
+    sample = ds[1]
+    assert sample["image"].dtype == torch.float32
+    assert torch.allclose(sample["image"], torch.ones_like(sample["image"]))
+
+    stretch = Normalize(summary, per_season=False, percentiles=(2, 98))
+    image = stretch({"image": torch.full((2, 12, 4, 4), 200, dtype=torch.uint16),
+                     "metadata": [{"season": "winter"}, {"season": "summer"}]})["image"]
+    assert torch.allclose(image, torch.tensor((200 - 100) / (201 - 100)))
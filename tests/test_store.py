@@ -0,0 +1,30 @@
+import torch
+
+from ssl4eo_eu_forest.store import export_store, SSL4EOEUForestStore
+from tests.test_dataset import make_cached_dataset
+
+
+def test_export_and_zero_copy_reads(tmp_path):
+    ds = make_cached_dataset(tmp_path / "cache", n_groups=3, bands=["B02", "B03", "B04"])
+    export_store(ds, str(tmp_path / "store"), shard_size=2, max_workers=2)
+
+    store = SSL4EOEUForestStore(str(tmp_path / "store"))
+    assert len(store) == 3
+    assert sorted(p.name for p in (tmp_path / "store").glob("images-*.npy")) == ["images-00000.npy", "images-00001.npy"]
+
+    sample = store[2]
+    expected = ds[2]
+    assert sample["group_id"] == expected["group_id"]
+    assert tuple(sample["image"].shape) == (4, 3, 264, 264)
+    assert sample["season_mask"].tolist() == [True, False, True, False]
+    assert torch.equal(sample["image"][0], expected["image"][0])
+    assert torch.equal(sample["image"][2], expected["image"][1])
+    assert not sample["image"][1].any()
+    assert torch.equal(sample["mask"], expected["mask"])
+    assert sample["metadata"][2]["timestamp_start"] == expected["metadata"][1]["timestamp_start"]
+    assert sample["metadata"][2]["transform"] == expected["metadata"][1]["transform"]
+    assert sample["metadata"][1]["tile_id"] is None
+
+    # views share memory with the memory-mapped shard
+    images, _ = store._shards[1]
+    assert sample["image"].data_ptr() == torch.from_numpy(images[0]).data_ptr()
@@ -15,16 +15,16 @@ from ssl4eo_eu_forest.utils import (
     metadata_jsonl_from_ssl4eo_eu_forest_dir
 )
 
-def create_dummy_tif(path, width=264, height=264, crs="EPSG:32632"):
-    data = np.zeros((1, height, width), dtype=np.uint16)
-    transform = from_origin(500000, 5000000, 10, 10)
+def create_dummy_tif(path, width=264, height=264, crs="EPSG:32632", origin=(500000, 5000000), count=1, fill=0):
+    data = np.full((count, height, width), fill, dtype=np.uint16)
+    transform = from_origin(origin[0], origin[1], 10, 10)
     with rasterio.open(
         path,
         "w",
         driver="GTiff",
         height=height,
         width=width,
-        count=1,
+        count=count,
         dtype="uint16",
         crs=crs,
         transform=transform
@@ -86,3 +86,128 @@ def test_metadata_jsonl_output(tmp_path):
         data = json.loads(lines[0])
         assert data["group_id"] == group_id
         assert data["dimensions_match"] is True
+
+def test_metadata_jsonl_incremental(tmp_path):
+    base_dir = tmp_path
+    for group_id in ["0000005", "0000006"]:
+        image_dir = base_dir / "images" / group_id / "20180206T084129_20180206T084229_T36SVF"
+        image_dir.mkdir(parents=True)
+        (base_dir / "masks" / group_id).mkdir(parents=True)
+        create_dummy_tif(base_dir / "masks" / group_id / "mask.tif")
+        create_dummy_tif(image_dir / "all_bands.tif")
+
+    metadata_jsonl_from_ssl4eo_eu_forest_dir(str(base_dir), incremental=True)
+    output_path = base_dir / "meta.jsonl"
+    assert (base_dir / "meta.fingerprints.json").exists()
+
+    # tamper with the stored rows: unchanged groups must be copied, not recomputed
+    rows = [json.loads(line) for line in output_path.read_text().splitlines()]
+    for row in rows:
+        row["mask_width"] = 999
+    output_path.write_text("".join(json.dumps(row) + "\n" for row in rows))
+
+    # add a group and modify the mask of another one
+    image_dir = base_dir / "images" / "0000007" / "20180424T082559_20180424T083114_T36SVF"
+    image_dir.mkdir(parents=True)
+    (base_dir / "masks" / "0000007").mkdir(parents=True)
+    create_dummy_tif(base_dir / "masks" / "0000007" / "mask.tif")
+    create_dummy_tif(image_dir / "all_bands.tif")
+    create_dummy_tif(base_dir / "masks" / "0000006" / "mask.tif", width=200)
+
+    metadata_jsonl_from_ssl4eo_eu_forest_dir(str(base_dir), incremental=True)
+    rows = {row["group_id"]: row for row in map(json.loads, output_path.read_text().splitlines())}
+    assert sorted(rows) == ["0000005", "0000006", "0000007"]
+    assert rows["0000005"]["mask_width"] == 999
+    assert rows["0000006"]["mask_width"] == 200
+    assert rows["0000006"]["dimensions_match"] is False
+    assert rows["0000007"]["images"][0]["season"] == "spring"
+
+def test_metadata_jsonl_incremental_restores_missing_rows(tmp_path):
+    base_dir = tmp_path
+    group_ids = ["0000001", "0000002", "0000003"]
+    for group_id in group_ids:
+        image_dir = base_dir / "images" / group_id / "20180206T084129_20180206T084229_T36SVF"
+        image_dir.mkdir(parents=True)
+        (base_dir / "masks" / group_id).mkdir(parents=True)
+        create_dummy_tif(base_dir / "masks" / group_id / "mask.tif")
+        create_dummy_tif(image_dir / "all_bands.tif")
+    metadata_jsonl_from_ssl4eo_eu_forest_dir(str(base_dir))
+    output_path = base_dir / "meta.jsonl"
+    lines = output_path.read_text().splitlines()
+
+    # partial output: groups without a stored row are read again despite their fingerprint
+    output_path.write_text(lines[0] + "\n")
+    metadata_jsonl_from_ssl4eo_eu_forest_dir(str(base_dir), incremental=True)
+    assert output_path.read_text().splitlines() == lines
+
+    # deleted output, kept sidecar
+    output_path.unlink()
+    metadata_jsonl_from_ssl4eo_eu_forest_dir(str(base_dir), incremental=True)
+    assert output_path.read_text().splitlines() == lines
+    metadata_jsonl_from_ssl4eo_eu_forest_dir(str(base_dir), incremental=True)
+    assert output_path.read_text().splitlines() == lines
+
+def test_metadata_jsonl_ordered_shards(tmp_path):
+    base_dir = tmp_path
+    group_ids = [f"{i:07d}" for i in (3, 1, 4, 0, 2)]
+    for group_id in group_ids:
+        image_dir = base_dir / "images" / group_id / "20180206T084129_20180206T084229_T36SVF"
+        image_dir.mkdir(parents=True)
+        (base_dir / "masks" / group_id).mkdir(parents=True)
+        create_dummy_tif(base_dir / "masks" / group_id / "mask.tif")
+        create_dummy_tif(image_dir / "all_bands.tif")
+
+    metadata_jsonl_from_ssl4eo_eu_forest_dir(str(base_dir), output="single.jsonl", chunksize=2)
+    lines = (base_dir / "single.jsonl").read_text().splitlines()
+    assert [json.loads(line)["group_id"] for line in lines] == sorted(group_ids)
+    assert not (base_dir / "meta.jsonl").exists()
+
+    metadata_jsonl_from_ssl4eo_eu_forest_dir(str(base_dir), num_shards=2, chunksize=2)
+    shards = sorted(base_dir.glob("meta-*-of-*.jsonl"))
+    assert [p.name for p in shards] == ["meta-00000-of-00002.jsonl", "meta-00001-of-00002.jsonl"]
+    sharded = [line for p in shards for line in p.read_text().splitlines()]
+    assert sharded == lines
+
+    metadata_jsonl_from_ssl4eo_eu_forest_dir(str(base_dir), num_shards=3, incremental=True)
+    assert len(list(base_dir.glob("meta-*-of-*.jsonl"))) == 3
+
+def test_batched_bboxes_match_transform_bounds():
+    from rasterio.crs import CRS
+    from rasterio.warp import transform_bounds
+    from ssl4eo_eu_forest.utils import bounds_to_epsg4326
+
+    crs = CRS.from_epsg(32632)
+    bounds = [(500000, 4997360, 502640, 5000000), (300000, 6000000, 310000, 6010000)]
+    expected = [transform_bounds(crs, "EPSG:4326", *b) for b in bounds]
+    assert np.allclose(bounds_to_epsg4326(crs, bounds), expected, atol=1e-9)
+
+def test_metadata_errors_are_reported(tmp_path):
+    base_dir = tmp_path
+    for group_id in ["0000001", "0000002", "0000003"]:
+        image_dir = base_dir / "images" / group_id / "20180206T084129_20180206T084229_T36SVF"
+        image_dir.mkdir(parents=True)
+        create_dummy_tif(image_dir / "all_bands.tif", crs="EPSG:32633")
+        if group_id != "0000003":
+            (base_dir / "masks" / group_id).mkdir(parents=True)
+            create_dummy_tif(base_dir / "masks" / group_id / "mask.tif", crs="EPSG:32632" if group_id == "0000001" else "EPSG:32633")
+    (base_dir / "images" / "0000002" / "20180206T084129_20180206T084229_T36SVF" / "all_bands.tif").write_bytes(b"broken")
+
+    errors = metadata_jsonl_from_ssl4eo_eu_forest_dir(str(base_dir), incremental=True)
+    rows = {row["group_id"]: row for row in map(json.loads, (base_dir / "meta.jsonl").read_text().splitlines())}
+    assert sorted(rows) == ["0000001", "0000002"]
+    assert rows["0000002"]["images"] == []
+    assert rows["0000001"]["bbox_epsg4326"] == pytest.approx(get_bbox_epsg4326(base_dir / "masks" / "0000001" / "mask.tif"))
+    assert rows["0000002"]["bbox_epsg4326"] == pytest.approx(get_bbox_epsg4326(base_dir / "masks" / "0000002" / "mask.tif"))
+
+    report = [json.loads(line) for line in (base_dir / "meta.errors.jsonl").read_text().splitlines()]
+    assert report == errors
+    assert [(e["group_id"], e["path"]) for e in report] == [
+        ("0000002", "images/0000002/20180206T084129_20180206T084229_T36SVF/all_bands.tif"),
+        ("0000003", "masks/0000003/mask.tif"),
+    ]
+    assert report[1]["error"] == "missing mask"
+    # the failed group is retried once its mask appears
+    (base_dir / "masks" / "0000003").mkdir(parents=True)
+    create_dummy_tif(base_dir / "masks" / "0000003" / "mask.tif")
+    assert len(metadata_jsonl_from_ssl4eo_eu_forest_dir(str(base_dir), incremental=True)) == 1
+    assert len((base_dir / "meta.jsonl").read_text().splitlines()) == 3